@@ -3,15 +3,38 @@
 First endpoint (route) will be to return the status of your API
 """
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 from models import storage
+from models.engine import json_codec
 from api.v1.views import app_views
 from os import getenv  # for environmental variables
 from flask import make_response  # for task 6 - errorhandler(404)
 from flask import jsonify  # convert to JSON data
 from flask_cors import CORS
 
+
+class CodecJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider of the app that encodes with models.engine.json_codec
+    (orjson or ujson when installed), so jsonify() uses the same encoder
+    as the storage engine
+    """
+
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string"""
+        # indent (pretty print en modo debug) lo maneja el json de python
+        if kwargs.get("indent"):
+            return super().dumps(obj, **kwargs)
+        return json_codec.dumps(obj, sort_keys=kwargs.get("sort_keys", True))
+
+    def loads(self, s, **kwargs):
+        """Deserialize s (str or bytes) to a python object"""
+        return json_codec.loads(s)
+
+
 # Creando una instancia de flask con el nombre del archivo nuestro
 app = Flask(__name__)
+app.json = CodecJSONProvider(app)
 # Register the blueprint app_views to your Flask instance app
 app.register_blueprint(app_views)
 # Allow CORS (Cross origin resource shearing)
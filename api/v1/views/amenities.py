@@ -9,24 +9,18 @@ from models.amenity import Amenity
 from flask import abort
 from flask import make_response  # errorhandler(404)
 from flask import request  # for get_json()
+from api.v1.views.conditional import conditional, object_response
+from api.v1.views.pagination import list_response
 
 
 @app_views.route("/amenities", strict_slashes=False, methods=['GET'])
+@conditional(Amenity)
 def return_amenities():
     """
     Return amenities - use GET request.
     """
-    # Traemos todos los objetos de la clase Amenity que esten en el storage
-    amenities = storage.all(Amenity)
-
-    # Se crea una lista para guardar los valores que retorna el metodo all(),
-    # estos valores son los objetos, los pasamos a un diccionario usando el
-    # metodo to_dict() tal cual pide la letra y luego lo pasamos a JSON usando
-    # el metodo jsonify
-    amenities_list = []
-    for key, value in amenities.items():
-        amenities_list.append(value.to_dict())
-    return jsonify(amenities_list)
+    # ?ids, ?limit, ?stream o la lista entera (ver pagination.py)
+    return list_response(Amenity)
 
 
 @app_views.route('/amenities/<amenity_id>', methods=['GET'],
@@ -35,19 +29,14 @@ def return_amenities_id(amenity_id):
     """
     Return amenity objects by id or 404 if the id does not exists.
     """
-    # Traemos todos los objetos de la clase Amenity que esten en el storage
-    amenities = storage.all(Amenity)
-
-    # Se hace lo mismo que en la ruta de amenities pero con la condicion de si
-    # tiene la misma ID que la que se pasa como argumento, si son la misma ID
-    # se retorna el valor como diccionario ya que JSON lo entiende.
+    # Traemos el objeto por su id con el metodo get() del storage, que lo
+    # busca directo por la clave sin recorrer todos los objetos de la clase
+    amenity = storage.get(Amenity, amenity_id)
 
-    for key, value in amenities.items():
-        # Condicion para ver si tienen la misma ID
-        if amenities[key].id == amenity_id:
-            return value.to_dict()
-    # Se usa el metodo abort de flask en caso que no se encuentre la ID pasada
-    abort(404)
+    # If the amenity_id is not linked to any Amenity object, raise a 404 error
+    if amenity is None:
+        abort(404)
+    return object_response(amenity)
 
 
 @app_views.route('/amenities/<amenity_id>', methods=['DELETE'],
@@ -129,7 +118,7 @@ def update_amenities_id(amenity_id):
                 setattr(amenity, key, value)
             else:
                 pass
-        # Se guarda el nuevo objeto dentro del storage
-        storage.save()
+        # save() actualiza updated_at y guarda el cambio
+        amenity.save()
         # Se devuelve el objeto creado y un status code de 200
         return make_response(jsonify(amenity.to_dict()), 200)
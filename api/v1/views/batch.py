@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+"""
+Batch create, update and delete shared by the /<objects>:batch views.
+
+The request body is a JSON list of operations:
+    {"op": "create", "data": {...}}
+    {"op": "update", "id": "...", "data": {...}}
+    {"op": "delete", "id": "..."}
+Every object and parent they refer to is fetched once, whatever the number
+of operations using it, and all the changes are persisted with a single
+storage.save(). The answer lists the status of each operation, in order.
+Updates and deletes refer to objects that exist before the batch. A create
+may give the id of the new object, an id that is already taken gets a 409.
+If the save() fails nothing is saved: storage.rollback() undoes every
+change of the batch, and the operations that had succeeded are reported
+with a 409 status.
+"""
+from datetime import datetime
+from flask import jsonify  # convert to JSON data
+from flask import make_response
+from flask import request
+from models import storage
+from os import getenv
+
+max_batch = int(getenv("HBNB_API_MAX_BATCH", "1000"))
+
+
+def run_batch(cls, parents, required, keys_ignore):
+    """
+    Apply the operations of the request to cls objects. parents maps the
+    foreign keys a create needs to their class (e.g. {"state_id": State}),
+    required lists the other attributes a create needs and keys_ignore the
+    ones an update does not change
+    """
+    ops = request.get_json(silent=True)
+    if ops is None:
+        return make_response(jsonify({"error": "Not a JSON"}), 400)
+    if not isinstance(ops, list):
+        return make_response(jsonify({"error": "Not a list"}), 400)
+    if len(ops) > max_batch:
+        return make_response(jsonify({"error": "Too many operations"}), 400)
+
+    # Se juntan las ids distintas para buscar cada objeto una sola vez
+    ids = set()
+    for op in ops:
+        if not isinstance(op, dict):
+            continue
+        data = op.get("data")
+        if op.get("op") == "create" and isinstance(data, dict):
+            for fk, parent in parents.items():
+                if isinstance(data.get(fk), str):
+                    ids.add((parent, data[fk]))
+            if isinstance(data.get("id"), str):
+                ids.add((cls, data["id"]))
+        elif isinstance(op.get("id"), str):
+            ids.add((cls, op["id"]))
+    found = {}
+    for parent, id in ids:
+        found[(parent, id)] = storage.get(parent, id)
+
+    results = []
+    # ids de los objetos creados en el batch
+    created = set()
+    for op in ops:
+        result = apply_op(cls, op, found, created, parents, required,
+                          keys_ignore)
+        results.append(result)
+    if any(result["status"] < 400 for result in results):
+        try:
+            storage.save()
+        except Exception:
+            storage.rollback()
+            results = [result if result["status"] >= 400 else
+                       {"status": 409, "error": "Not saved"}
+                       for result in results]
+            return make_response(jsonify(results), 409)
+    return make_response(jsonify(results), 200)
+
+
+def apply_op(cls, op, found, created, parents, required, keys_ignore):
+    """
+    Apply a single operation, returns its {"status": ...} result. created
+    holds the ids of the objects created by the previous operations
+    """
+    if not isinstance(op, dict):
+        return {"status": 400, "error": "Not a JSON"}
+    data = op.get("data", {})
+    if not isinstance(data, dict):
+        return {"status": 400, "error": "Not a JSON"}
+
+    if op.get("op") == "create":
+        for fk, parent in parents.items():
+            if fk not in data:
+                return {"status": 400, "error": "Missing " + fk}
+            if not isinstance(data[fk], str):
+                return {"status": 400, "error": "Invalid " + fk}
+            if found.get((parent, data[fk])) is None:
+                return {"status": 404, "error": "Not found"}
+        for name in required:
+            if name not in data:
+                return {"status": 400, "error": "Missing " + name}
+        if "id" in data:
+            if not isinstance(data["id"], str):
+                return {"status": 400, "error": "Invalid id"}
+            # la id no puede pisar un objeto que ya existe
+            if found.get((cls, data["id"])) is not None or \
+                    data["id"] in created:
+                return {"status": 409, "error": "Already exists"}
+        obj = cls(**data)
+        storage.new(obj)
+        created.add(obj.id)
+        return {"status": 201, "id": obj.id, "object": obj.to_dict()}
+
+    if op.get("op") not in ("update", "delete"):
+        return {"status": 400, "error": "Unknown op"}
+    if not isinstance(op.get("id"), str):
+        return {"status": 400, "error": "Invalid id"}
+    obj = found.get((cls, op.get("id")))
+    if obj is None:
+        return {"status": 404, "error": "Not found"}
+    if op["op"] == "delete":
+        storage.delete(obj)
+        # un segundo delete de la misma id da 404
+        found[(cls, obj.id)] = None
+        return {"status": 200, "id": obj.id}
+    for key, value in data.items():
+        # __class__ viene con el to_dict() que devuelve la API
+        if key not in keys_ignore and key != "__class__":
+            setattr(obj, key, value)
+    # lo mismo que hace obj.save(), sin guardar todavia
+    obj.updated_at = datetime.utcnow()
+    storage.new(obj)
+    return {"status": 200, "id": obj.id, "object": obj.to_dict()}
@@ -10,10 +10,15 @@ from models.city import City
 from flask import abort
 from flask import make_response  # errorhandler(404)
 from flask import request  # for get_json()
+from api.v1.views.batch import run_batch
+from api.v1.views.conditional import conditional, object_response
+from api.v1.views.multi_get import ids_response
+from api.v1.views.pagination import list_response, wants_page
 
 
 @app_views.route("/states/<state_id>/cities", strict_slashes=False,
                  methods=['GET'])
+@conditional(City, State)
 def return_cities(state_id):
     """
     Return cities - use GET request
@@ -24,16 +29,26 @@ def return_cities(state_id):
     """
     # Traemos el objeto especifico de state por id con el metódo get creado en
     # DBStorage.
-    states = storage.get(State, state_id)
+    # Con load las cities vienen en el mismo SELECT (JOIN) en DBStorage, salvo
+    # que se pida una pagina, que las trae por su cuenta
+    load = ("cities",) if not wants_page() else ()
+    states = storage.get(State, state_id, load=load)
 
     # If the state_id is not linked to any State object, raise a 404 error
     if states is None:
         abort(404)
 
-    cities = []
-    for city in states.cities:
-        cities.append(city.to_dict())
-    return jsonify(cities)
+    # ?limit, ?stream o la lista entera (ver pagination.py)
+    return list_response(City, lambda: states.cities, state_id=state_id)
+
+
+@app_views.route("/cities", strict_slashes=False, methods=['GET'])
+@conditional(City)
+def return_cities_ids():
+    """
+    Return the City objects whose ids are passed as ?ids=a,b,c
+    """
+    return ids_response(City)
 
 
 @app_views.route('/cities/<city_id>', methods=['GET'],
@@ -50,7 +65,7 @@ def return_cities_id(city_id):
     if cities is None:
         abort(404)
     # Se devuelve el objeto pasado a json:
-    return jsonify(cities.to_dict())
+    return object_response(cities)
 
 
 @app_views.route('/cities/<city_id>', methods=['DELETE'],
@@ -144,7 +159,16 @@ def update_cities_id(city_id):
                 setattr(city, key, value)
             else:
                 pass
-        # Se guarda el nuevo objeto dentro del storage
-        storage.save()
+        # save() actualiza updated_at y guarda el cambio
+        city.save()
         # Se devuelve el objeto creado y un status code de 200
         return make_response(jsonify(city.to_dict()), 200)
+
+
+@app_views.route("/cities:batch", strict_slashes=False, methods=['POST'])
+def batch_cities():
+    """
+    Create, update and delete City objects with a single save (batch.py)
+    """
+    return run_batch(City, {"state_id": State}, ["name"],
+                     ["id", "state_id", "created_at", "updated_at"])
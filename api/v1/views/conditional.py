@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""
+Conditional GET support shared by the views.
+
+Objects are sent with a strong ETag and a Last-Modified header built from
+their (id, updated_at), lists with a weak ETag built from the version the
+storage engine keeps for each class. A request whose If-None-Match (or,
+without it, If-Modified-Since) matches gets a 304 before anything is
+serialized.
+"""
+from datetime import timezone
+from functools import wraps
+from hashlib import sha1
+from flask import Response
+from flask import jsonify  # convert to JSON data
+from flask import request
+from models import storage
+from models.base_model import format_time
+
+
+def not_modified(etag, weak=False, last_modified=None):
+    """Return the 304 response for etag if the client has it, else None"""
+    if request.if_none_match:
+        # If-Modified-Since se ignora cuando viene If-None-Match (RFC 7232)
+        fresh = request.if_none_match.contains_weak(etag)
+    elif last_modified is not None and request.if_modified_since:
+        # las fechas HTTP no tienen fraccion de segundo
+        fresh = (last_modified.replace(microsecond=0) <=
+                 request.if_modified_since)
+    else:
+        fresh = False
+    if not fresh:
+        return None
+    response = Response(status=304)
+    response.set_etag(etag, weak)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+
+def object_response(obj):
+    """Return obj as JSON with its ETag and Last-Modified, or a 304"""
+    etag = "{}-{}".format(obj.id, format_time(obj.updated_at))
+    last_modified = obj.updated_at.replace(tzinfo=timezone.utc)
+    response = not_modified(etag, last_modified=last_modified)
+    if response is not None:
+        return response
+    response = jsonify(obj.to_dict())
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    return response
+
+
+def conditional(*classes):
+    """
+    Decorator for the list views: answers 304 while none of the objects
+    of classes changed since the client got the list it sends the ETag of
+    """
+    def decorator(view):
+        """wraps view"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            """sets or checks the ETag of the list"""
+            versions = [str(storage.version(cls)) for cls in classes]
+            # limit, cursor y stream cambian el cuerpo, van en el ETag
+            etag = sha1("|".join(versions + [request.full_path])
+                        .encode("utf-8")).hexdigest()
+            response = not_modified(etag, weak=True)
+            if response is not None:
+                return response
+            response = view(*args, **kwargs)
+            if isinstance(response, Response) and \
+                    response.status_code == 200:
+                response.set_etag(etag, weak=True)
+            return response
+        return wrapper
+    return decorator
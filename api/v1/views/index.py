@@ -8,7 +8,10 @@ Requirements:
 """
 from api.v1.views import app_views
 from flask import jsonify  # convert to JSON data
+from flask import request
 from models import storage
+from os import getenv
+from time import monotonic
 # Import classes for task 5
 from models.amenity import Amenity
 from models.city import City
@@ -17,6 +20,11 @@ from models.review import Review
 from models.state import State
 from models.user import User
 
+# /stats is answered from this cache for HBNB_API_STATS_TTL seconds, or until
+# a POST, PUT or DELETE request goes through the API (see stats_invalidate)
+stats_ttl = float(getenv("HBNB_API_STATS_TTL", "5"))
+stats_cache = {"stats": None, "expires": 0}
+
 
 @app_views.route("/status")
 def return_status():
@@ -28,13 +36,25 @@ def return_status():
 def return_stats():
     """
     Return the number of each object by type
-    Se usa la funcion count() que creamos en la task 3, importamos storage
-    ya que esta tiene creada las instancias de dbstorage y filestorage y asi
-    podemos usar el metodo creado: count()
+    Se usa la funcion count_all() del storage, que trae la cantidad de
+    objetos de todas las clases de una sola vez, y se guarda el resultado
+    unos segundos para no volver a contar en cada request.
     """
-    return jsonify({'amenities': storage.count(Amenity),
-                    'cities': storage.count(City),
-                    'places': storage.count(Place),
-                    'reviews': storage.count(Review),
-                    'states': storage.count(State),
-                    'users': storage.count(User)})
+    if stats_cache["stats"] is None or monotonic() > stats_cache["expires"]:
+        counts = storage.count_all()
+        stats_cache["stats"] = {'amenities': counts['Amenity'],
+                                'cities': counts['City'],
+                                'places': counts['Place'],
+                                'reviews': counts['Review'],
+                                'states': counts['State'],
+                                'users': counts['User']}
+        stats_cache["expires"] = monotonic() + stats_ttl
+    return jsonify(stats_cache["stats"])
+
+
+@app_views.after_request
+def stats_invalidate(response):
+    """Drop the cached /stats after any request that changes objects"""
+    if request.method in ("POST", "PUT", "DELETE"):
+        stats_cache["stats"] = None
+    return response
@@ -0,0 +1,23 @@
+#!/usr/bin/python3
+"""
+Multi-get shared by the views: GET /api/v1/<objects>?ids=a,b,c answers
+the objects with those ids (the ones that exist, in the order asked)
+with a single storage.get_many(), one IN (...) query in DBStorage.
+"""
+from flask import jsonify  # convert to JSON data
+from flask import make_response
+from flask import request
+from models import storage
+from api.v1.views.pagination import max_limit
+
+
+def ids_response(cls):
+    """Return the cls objects whose ids are in ?ids= as a JSON list"""
+    # dict.fromkeys saca las ids repetidas sin cambiar el orden
+    ids = list(dict.fromkeys(id for id in
+                             request.args.get("ids", "").split(",") if id))
+    if not ids:
+        return make_response(jsonify({"error": "Missing ids"}), 400)
+    if len(ids) > max_limit:
+        return make_response(jsonify({"error": "Too many ids"}), 400)
+    return jsonify([obj.to_dict() for obj in storage.get_many(cls, ids)])
@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+"""
+Server-side pagination shared by the list views.
+
+A list view called with ?limit=N answers with at most N objects ordered
+by (created_at, id). When there are more, the response carries a
+Link: <...>; rel="next" header (and X-Next-Cursor) pointing at the next
+page through an opaque cursor made of the (created_at, id) of the last
+object, so pages stay stable while objects are added or deleted.
+A ?cursor without ?limit gets pages of HBNB_API_MAX_LIMIT objects.
+
+list_response() is the GET of every list view: ?ids, ?limit/?cursor,
+?stream or the whole list.
+"""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+import json
+from flask import jsonify  # convert to JSON data
+from flask import make_response
+from flask import request
+from flask import url_for
+from models import storage
+from models.base_model import format_time, parse_time
+from os import getenv
+from api.v1.views.streaming import stream, wants_stream
+
+max_limit = int(getenv("HBNB_API_MAX_LIMIT", "1000"))
+
+
+def encode_cursor(obj):
+    """Return the cursor pointing right after obj"""
+    data = json.dumps([format_time(obj.created_at), obj.id])
+    return urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return the (created_at, id) pair of a cursor, ValueError if invalid"""
+    try:
+        data = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(data.decode("utf-8"))
+        created_at = parse_time(created_at)
+    except Exception:
+        raise ValueError("invalid cursor")
+    # encode_cursor() only writes naive (UTC) times and string ids, the
+    # others can not be compared with the stored (created_at, id) pairs
+    if created_at.tzinfo is not None or not isinstance(id, str):
+        raise ValueError("invalid cursor")
+    return (created_at, id)
+
+
+def wants_page():
+    """Return True when the request asked for a single page"""
+    return "limit" in request.args or "cursor" in request.args
+
+
+def page_args(default=None):
+    """
+    Return the (limit, after) asked for by ?limit and ?cursor, limit is
+    default when it is not given. ValueError if either one is invalid
+    """
+    limit = default
+    if "limit" in request.args:
+        limit = min(int(request.args["limit"]), max_limit)
+    if limit is not None and limit < 1:
+        raise ValueError("invalid limit")
+    after = None
+    if request.args.get("cursor"):
+        after = decode_cursor(request.args["cursor"])
+    return limit, after
+
+
+def page_response(objs, limit):
+    """
+    Return the first limit objs as a JSON response, linking to the next
+    page when objs has more (the caller asks storage for limit + 1)
+    """
+    response = jsonify([obj.to_dict() for obj in objs[:limit]])
+    if len(objs) > limit:
+        cursor = encode_cursor(objs[limit - 1])
+        url = url_for(request.endpoint, _external=True, limit=limit,
+                      cursor=cursor, **request.view_args)
+        response.headers["Link"] = '<{}>; rel="next"'.format(url)
+        response.headers["X-Next-Cursor"] = cursor
+    return response
+
+
+def invalid_page():
+    """Return the 400 response to an invalid ?limit or ?cursor"""
+    return make_response(jsonify({"error": "Invalid limit or cursor"}), 400)
+
+
+def paginate(cls, **filters):
+    """
+    Return the page of cls objects asked for by ?limit and ?cursor as a
+    JSON response, filters restrict it to a parent (e.g. state_id=...)
+    """
+    try:
+        limit, after = page_args(max_limit)
+    except ValueError:
+        return invalid_page()
+
+    # Se pide un objeto de mas para saber si hay una pagina siguiente
+    return page_response(storage.page(cls, limit + 1, after, **filters),
+                         limit)
+
+
+def list_response(cls, objs=None, **filters):
+    """
+    Return the list of cls objects the request asks for. objs is a
+    function returning the objects of the whole list (e.g. the cities of a
+    state), every cls object if None, and filters select the same objects
+    for a page (e.g. state_id=...). ?ids only applies to the lists of
+    every cls object
+    """
+    # Con ?ids=a,b,c se devuelven solo esos objetos (ver multi_get.py)
+    if objs is None and "ids" in request.args:
+        # multi_get.py usa max_limit de este modulo
+        from api.v1.views.multi_get import ids_response
+        return ids_response(cls)
+
+    # Con ?limit=N se devuelve una sola pagina
+    if wants_page():
+        return paginate(cls, **filters)
+
+    # iter_all() trae los objetos de a uno, sin armar el diccionario de all()
+    objs = objs() if objs is not None else storage.iter_all(cls)
+
+    # Con ?stream=1 se manda la lista de a pedazos (ver streaming.py)
+    if wants_stream():
+        return stream(objs)
+    return jsonify([obj.to_dict() for obj in objs])
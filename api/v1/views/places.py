@@ -11,10 +11,17 @@ from models.place import Place
 from flask import abort
 from flask import make_response  # errorhandler(404)
 from flask import request  # for get_json()
+from api.v1.views.batch import run_batch
+from api.v1.views.conditional import conditional, object_response
+from api.v1.views.multi_get import ids_response
+from api.v1.views.pagination import invalid_page, max_limit, page_args
+from api.v1.views.pagination import list_response, page_response
+from api.v1.views.pagination import wants_page
 
 
 @app_views.route("/cities/<city_id>/places", strict_slashes=False,
                  methods=['GET'])
+@conditional(Place, City)
 def return_places(city_id):
     """
     Return places - use GET request.
@@ -23,16 +30,27 @@ def return_places(city_id):
     """
     # Traemos el objeto especifico de city por id con el metódo get
     # creado en DBStorage
-    city = storage.get(City, city_id)
+    # Con load los places vienen en el mismo SELECT (JOIN) en DBStorage, salvo
+    # que se pida una pagina, que los trae por su cuenta
+    load = ("places",) if not wants_page() else ()
+    city = storage.get(City, city_id, load=load)
 
     # If the city_id is not linked to any City object, raise a 404 error
     if city is None:
         # Se usa el metodo abort de flask en caso que no se encuentre la ID
         abort(404)
-    places = []
-    for place in city.places:
-        places.append(place.to_dict())
-    return jsonify(places)
+
+    # ?limit, ?stream o la lista entera (ver pagination.py)
+    return list_response(Place, lambda: city.places, city_id=city_id)
+
+
+@app_views.route("/places", strict_slashes=False, methods=['GET'])
+@conditional(Place)
+def return_places_ids():
+    """
+    Return the Place objects whose ids are passed as ?ids=a,b,c
+    """
+    return ids_response(Place)
 
 
 @app_views.route('/places/<place_id>', methods=['GET'],
@@ -48,7 +66,7 @@ def return_places_id(place_id):
     # If the place_id is not linked to any Place object, raise a 404 error
     if place is None:
         abort(404)
-    return jsonify(place.to_dict())
+    return object_response(place)
 
 
 @app_views.route('/places/<place_id>', methods=['DELETE'],
@@ -157,7 +175,50 @@ def update_places_id(place_id):
                 setattr(place, key, value)
             else:
                 pass
-        # Se guarda el nuevo objeto dentro del storage
-        storage.save()
+        # save() actualiza updated_at y guarda el cambio
+        place.save()
         # Se devuelve el objeto creado y un status code de 200
         return make_response(jsonify(place.to_dict()), 200)
+
+
+@app_views.route("/places:batch", strict_slashes=False, methods=['POST'])
+def batch_places():
+    """
+    Create, update and delete Place objects with a single save (batch.py)
+    """
+    return run_batch(Place, {"city_id": City, "user_id": User}, ["name"],
+                     ["id", "user_id", "city_id", "created_at",
+                      "updated_at"])
+
+
+@app_views.route("/places_search", strict_slashes=False, methods=['POST'])
+def places_search():
+    """
+    Return the places in the "states" and "cities" (lists of ids) of the
+    request body that have every one of its "amenities". Without states
+    and cities every place is searched, an empty body returns them all.
+    Results come in pages of ?limit (max_limit by default), see
+    pagination.py
+    """
+    body = request.get_json(silent=True)
+
+    # If the HTTP request body is not valid JSON, raise a 400 error
+    if not isinstance(body, dict):
+        return make_response(jsonify({"error": "Not a JSON"}), 400)
+    try:
+        limit, after = page_args(max_limit)
+    except ValueError:
+        return invalid_page()
+
+    filters = {}
+    for name in ("states", "cities", "amenities"):
+        ids = body.get(name) or []
+        if not isinstance(ids, list):
+            return make_response(jsonify({"error": "Not a list"}), 400)
+        filters[name] = [id for id in ids if isinstance(id, str)]
+
+    # Los indices (state -> cities -> places, amenity -> places) del storage
+    # resuelven la busqueda, se pide un place de mas para saber si hay otra
+    # pagina
+    places = storage.search_places(limit=limit + 1, after=after, **filters)
+    return page_response(places, limit)
@@ -12,10 +12,14 @@ from models.review import Review
 from flask import abort
 from flask import make_response  # errorhandler(404)
 from flask import request  # for get_json()
+from api.v1.views.conditional import conditional, object_response
+from api.v1.views.multi_get import ids_response
+from api.v1.views.pagination import list_response, wants_page
 
 
 @app_views.route("/places/<place_id>/reviews", strict_slashes=False,
                  methods=['GET'])
+@conditional(Review, Place)
 def return_reviews(place_id):
     """
     Return reviews - use GET request.
@@ -24,16 +28,26 @@ def return_reviews(place_id):
     """
     # Traemos el objeto especifico de place por id con el metódo get
     # creado en DBStorage.
-    place = storage.get(Place, place_id)
+    # Con load los reviews vienen en el mismo SELECT (JOIN) en DBStorage, salvo
+    # que se pida una pagina, que los trae por su cuenta
+    load = ("reviews",) if not wants_page() else ()
+    place = storage.get(Place, place_id, load=load)
 
     # If the place_id is not linked to any Place object, raise a 404 error
     if place is None:
         abort(404)
 
-    reviews = []
-    for review in place.reviews:
-        reviews.append(review.to_dict())
-    return jsonify(reviews)
+    # ?limit, ?stream o la lista entera (ver pagination.py)
+    return list_response(Review, lambda: place.reviews, place_id=place_id)
+
+
+@app_views.route("/reviews", strict_slashes=False, methods=['GET'])
+@conditional(Review)
+def return_reviews_ids():
+    """
+    Return the Review objects whose ids are passed as ?ids=a,b,c
+    """
+    return ids_response(Review)
 
 
 @app_views.route('/reviews/<review_id>', methods=['GET'],
@@ -49,7 +63,7 @@ def return_reviews_id(review_id):
     # If the review_id is not linked to any Review object, raise a 404 error
     if review is None:
         abort(404)
-    return jsonify(review.to_dict())
+    return object_response(review)
 
 
 @app_views.route('/reviews/<review_id>', methods=['DELETE'],
@@ -158,7 +172,7 @@ def update_review_id(review_id):
                 setattr(review, key, value)
             else:
                 pass
-        # Se guarda el nuevo objeto dentro del storage
-        storage.save()
+        # save() actualiza updated_at y guarda el cambio
+        review.save()
         # Se devuelve el objeto creado y un status code de 200
         return make_response(jsonify(review.to_dict()), 200)
@@ -9,9 +9,12 @@ from models.state import State
 from flask import abort
 from flask import make_response  # errorhandler(404)
 from flask import request  # for get_json()
+from api.v1.views.conditional import conditional, object_response
+from api.v1.views.pagination import list_response
 
 
 @app_views.route("/states", strict_slashes=False, methods=['GET'])
+@conditional(State)
 def return_states():
     """
     Return states - use GET request.
@@ -20,17 +23,8 @@ def return_states():
     Se pone la opcion de strict_slashes=False para que no haya problemas si se
     pasa un / (slash) al final de la ruta y que corra igual.
     """
-    # Traemos todos los objetos de la clase State que esten en la base de datos
-    states = storage.all(State)
-
-    # Se crea una lista para guardar los valores que retorna el metodo all(),
-    # estos valores son los objetos, los pasamos a un diccionario usando el
-    # metodo to_dict() tal cual pide la letra y luego lo pasamos a JSON usando
-    # el metodo jsonify
-    states_list = []
-    for key, value in states.items():
-        states_list.append(value.to_dict())
-    return jsonify(states_list)
+    # ?ids, ?limit, ?stream o la lista entera (ver pagination.py)
+    return list_response(State)
 
 
 @app_views.route('/states/<state_id>', methods=['GET'], strict_slashes=False)
@@ -39,19 +33,14 @@ def return_states_id(state_id):
     Return state objects by id or 404 if the id does not exists.
     Info abort --> https://flask-restplus.readthedocs.io/en/stable/errors.html
     """
-    # Traemos todos los objetos de la clase State que esten en la base de datos
-    states = storage.all(State)
-
-    # Se hace lo mismo que en la ruta de states pero con la condicion de si se
-    # tiene la misma ID que la que se pasa como argumento, si son la misma ID
-    # se retorna el valor como diccionario ya que JSON lo entiende.
+    # Traemos el objeto por su id con el metodo get() del storage, que lo
+    # busca directo por la clave sin recorrer todos los objetos de la clase
+    state = storage.get(State, state_id)
 
-    for key, value in states.items():
-        # Condicion para ver si tienen la misma ID
-        if states[key].id == state_id:
-            return value.to_dict()
-    # Se usa el metodo abort de flask en caso que no se encuentre la ID pasada
-    abort(404)
+    # If the state_id is not linked to any State object, raise a 404 error
+    if state is None:
+        abort(404)
+    return object_response(state)
 
 
 @app_views.route('/states/<state_id>', methods=['DELETE'],
@@ -134,7 +123,7 @@ def update_states_id(state_id):
                 setattr(state, key, value)
             else:
                 pass
-        # Se guarda el nuevo objeto dentro del storage
-        storage.save()
+        # save() actualiza updated_at y guarda el cambio
+        state.save()
         # Se devuelve el objeto creado y un status code de 200
         return make_response(jsonify(state.to_dict()), 200)
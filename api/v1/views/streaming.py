@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+"""
+Streaming JSON responses shared by the list views.
+
+A list view called with ?stream=1 answers with a chunked JSON array built
+from a generator over the objects, so the whole list and its serialized
+text are never held in memory at once and the first bytes leave as soon
+as the first chunk is ready.
+"""
+from flask import Response
+from flask import request
+from flask import stream_with_context
+from models.engine.json_codec import dumps
+from os import getenv
+
+# int - objects serialized per chunk sent to the client
+chunk_size = int(getenv("HBNB_API_STREAM_CHUNK", "500"))
+
+
+def wants_stream():
+    """Return True when the request asked for a streamed response"""
+    return request.args.get("stream", "").lower() in ("1", "true", "yes")
+
+
+def stream(objs):
+    """Return a response streaming the to_dict() of objs as a JSON array"""
+    def generate():
+        """yields the array one chunk of objects at a time"""
+        yield "["
+        sep = ""
+        chunk = []
+        for obj in objs:
+            chunk.append(dumps(obj.to_dict(), sort_keys=True))
+            if len(chunk) == chunk_size:
+                yield sep + ",".join(chunk)
+                sep = ","
+                chunk = []
+        if chunk:
+            yield sep + ",".join(chunk)
+        yield "]\n"
+
+    # stream_with_context mantiene la sesion abierta hasta el ultimo chunk
+    return Response(stream_with_context(generate()),
+                    mimetype="application/json")
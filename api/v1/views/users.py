@@ -9,24 +9,18 @@ from models.user import User
 from flask import abort
 from flask import make_response  # errorhandler(404)
 from flask import request  # for get_json()
+from api.v1.views.conditional import conditional, object_response
+from api.v1.views.pagination import list_response
 
 
 @app_views.route("/users", strict_slashes=False, methods=['GET'])
+@conditional(User)
 def return_users():
     """
     Return users - use GET request.
     """
-    # Traemos todos los objetos de la clase User que esten en la base de datos
-    users = storage.all(User)
-
-    # Se crea una lista para guardar los valores que retorna el metodo all(),
-    # estos valores son los objetos, los pasamos a un diccionario usando el
-    # metodo to_dict() tal cual pide la letra y luego lo pasamos a JSON usando
-    # el metodo jsonify
-    users_list = []
-    for key, value in users.items():
-        users_list.append(value.to_dict())
-    return jsonify(users_list)
+    # ?ids, ?limit, ?stream o la lista entera (ver pagination.py)
+    return list_response(User)
 
 
 @app_views.route('/users/<user_id>', methods=['GET'],
@@ -35,19 +29,14 @@ def return_users_id(user_id):
     """
     Return users objects by id or 404 if the id does not exists
     """
-    # Traemos todos los objetos de la clase User que esten en la base de datos
-    users = storage.all(User)
-
-    # Se hace lo mismo que en la ruta de users pero con la condicion de si se
-    # tiene la misma ID que la que se pasa como argumento, si son la misma ID
-    # se retorna el valor como diccionario ya que JSON lo entiende.
+    # Traemos el objeto por su id con el metodo get() del storage, que lo
+    # busca directo por la clave sin recorrer todos los objetos de la clase
+    user = storage.get(User, user_id)
 
-    for key, value in users.items():
-        # Condicion para ver si tienen la misma ID
-        if users[key].id == user_id:
-            return value.to_dict()
-    # Se usa el metodo abort de flask en caso que no se encuentre la ID pasada
-    abort(404)
+    # If the user_id is not linked to any User object, raise a 404 error
+    if user is None:
+        abort(404)
+    return object_response(user)
 
 
 @app_views.route('/users/<user_id>', methods=['DELETE'],
@@ -132,7 +121,7 @@ def update_users_id(user_id):
                 setattr(user, key, value)
             else:
                 pass
-        # Se guarda el nuevo objeto dentro del storage
-        storage.save()
+        # save() actualiza updated_at y guarda el cambio
+        user.save()
         # Se devuelve el objeto creado y un status code de 200
         return make_response(jsonify(user.to_dict()), 200)
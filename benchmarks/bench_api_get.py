@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""
+Load test of GET /api/v1/users/<id> and /api/v1/amenities/<id>: fires
+requests from several threads through the Flask test client and reports
+the p50 and p99 latency as the number of stored objects grows
+
+Usage: python3 -m benchmarks.bench_api_get [size ...]
+       (default: 1000 10000 100000, HBNB_BENCH_THREADS threads, default 8)
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from models import storage
+from models.amenity import Amenity
+from models.engine.file_storage import FileStorage
+from models.user import User
+from api.v1.app import app
+
+requests_per_size = 2000
+
+
+def fill(cls, count, ids, **kwargs):
+    """adds cls objects to the storage until it holds count of them"""
+    for i in range(count - storage.count(cls)):
+        obj = cls(**kwargs)
+        storage.new(obj)
+        ids.append(obj.id)
+
+
+def fire(urls):
+    """GETs every url with its own client, returns the latencies in ms"""
+    client = app.test_client()
+    latencies = []
+    for url in urls:
+        start = time.perf_counter()
+        response = client.get(url)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, url
+    return latencies
+
+
+def percentile(values, p):
+    """returns the p-th percentile of the sorted list values"""
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    threads = int(os.getenv("HBNB_BENCH_THREADS", "8"))
+    path = os.path.join(tempfile.mkdtemp(), "file.json")
+    FileStorage._FileStorage__file_path = path
+    FileStorage._FileStorage__journal_path = path + ".log"
+    user_ids = []
+    amenity_ids = []
+    for size in sizes:
+        fill(User, size, user_ids, email="bench", password="bench")
+        fill(Amenity, size, amenity_ids, name="bench")
+        for name, ids in (("users", user_ids), ("amenities", amenity_ids)):
+            urls = ["/api/v1/{}/{}".format(name, random.choice(ids))
+                    for i in range(requests_per_size)]
+            with ThreadPoolExecutor(threads) as pool:
+                chunks = pool.map(fire, [urls[i::threads]
+                                         for i in range(threads)])
+            latencies = sorted(ms for chunk in chunks for ms in chunk)
+            print("{:>9} {:9s} p50: {:7.3f} ms  p99: {:7.3f} ms".format(
+                size, name, percentile(latencies, 50),
+                percentile(latencies, 99)))
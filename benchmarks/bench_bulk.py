@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""
+Loads reviews into the configured storage (HBNB_TYPE_STORAGE) with
+storage.bulk_new() and reports the rows per second, next to new() + save()
+per object on the first few of them
+
+Usage: python3 -m benchmarks.bench_bulk [size [per_object]]
+       (default: 1000000 reviews, 1000 of them one by one)
+"""
+import os
+import sys
+import tempfile
+import time
+import models
+from models import storage
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+
+def parents():
+    """creates the place and user the reviews belong to"""
+    state = State(name="bench")
+    city = City(name="bench", state_id=state.id)
+    user = User(email="bench", password="bench")
+    place = Place(name="bench", city_id=city.id, user_id=user.id)
+    for obj in (state, city, user, place):
+        storage.new(obj)
+    storage.save()
+    return place, user
+
+
+def rate(label, count, seconds):
+    """prints the rows per second of a load"""
+    print("{:24s} {:>9} rows {:8.3f} s {:>10.0f} rows/s".format(
+        label, count, seconds, count / seconds))
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    per_object = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    if models.storage_t != "db":
+        path = os.path.join(tempfile.mkdtemp(), "file.json")
+        FileStorage._FileStorage__file_path = path
+        FileStorage._FileStorage__journal_path = path + ".log"
+    place, user = parents()
+
+    start = time.perf_counter()
+    for i in range(per_object):
+        review = Review(place_id=place.id, user_id=user.id, text="bench")
+        storage.new(review)
+        storage.save()
+    rate("new() + save()", per_object, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    reviews = [Review(place_id=place.id, user_id=user.id, text="bench")
+               for i in range(size)]
+    built = time.perf_counter() - start
+    rate("building the objects", size, built)
+    start = time.perf_counter()
+    storage.bulk_new(reviews)
+    rate("bulk_new()", size, time.perf_counter() - start)
+    rate("total", size, time.perf_counter() - start + built)
@@ -0,0 +1,31 @@
+#!/usr/bin/python3
+"""
+Measures storage.get(cls, id) latency as the number of stored objects grows
+
+Usage: python3 -m benchmarks.bench_get [size ...]  (default: 1000 ... 1000000)
+"""
+import sys
+import timeit
+from models import storage
+from models.place import Place
+from models.review import Review
+
+
+def fill(count):
+    """adds objects to the storage until it holds count of them"""
+    for i in range(count - storage.count()):
+        storage.new(Review(place_id="bench", text="bench"))
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000,
+                                                   1000000]
+    place = Place(name="bench")
+    storage.new(place)
+    for size in sizes:
+        fill(size)
+        runs = 10000
+        seconds = timeit.timeit(lambda: storage.get(Place, place.id),
+                                number=runs)
+        print("{:>9} objects: {:8.3f} us/get".format(
+            storage.count(), seconds / runs * 1e6))
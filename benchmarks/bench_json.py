@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""
+Compares the JSON backends of models.engine.json_codec on Place and
+Review payloads: to_dict() + dumps() of each object, with the datetimes
+formatted by to_dict() or left to the backend, and loads() of the result
+
+Usage: python3 -m benchmarks.bench_json [size]  (default: 100000)
+"""
+import sys
+import time
+from models.engine.json_codec import backends, load_backend
+from models.place import Place
+from models.review import Review
+
+
+def make_objects(size):
+    """returns size Places and size Reviews with realistic attributes"""
+    objs = []
+    for i in range(size):
+        place = Place(city_id="bench", user_id="bench",
+                      name="Lovely place number {}".format(i),
+                      description="A cozy apartment with a view over the " +
+                      "river, close to the old town, great for couples " +
+                      "and families. Fully equipped kitchen.",
+                      number_rooms=3, number_bathrooms=2, max_guest=6,
+                      price_by_night=120, latitude=37.773972,
+                      longitude=-122.431297)
+        place.amenity_ids = ["amenity-{}".format(n) for n in range(5)]
+        review = Review(place_id=place.id, user_id="bench",
+                        text="Great location, the host was very helpful " +
+                        "and the place was spotless. Would stay again!")
+        objs.append(place)
+        objs.append(review)
+    return objs
+
+
+def run(name, dumps, loads, objs, format_times):
+    """encodes and decodes objs, prints the objects per second of each"""
+    start = time.perf_counter()
+    texts = [dumps(obj.to_dict(format_times)) for obj in objs]
+    encode = time.perf_counter() - start
+    start = time.perf_counter()
+    for text in texts:
+        loads(text)
+    decode = time.perf_counter() - start
+    label = "to_dict()" if format_times else "datetimes"
+    print("{:7s} {:10s} dumps: {:>10.0f} objects/s  loads: {:>10.0f} "
+          "objects/s".format(name, label, len(objs) / encode,
+                             len(objs) / decode))
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    objs = make_objects(size)
+    for name in backends:
+        found, dumps, loads = load_backend(name)
+        if found != name:
+            print("{:7s} not installed".format(name))
+            continue
+        run(name, dumps, loads, objs, True)
+        run(name, dumps, loads, objs, False)
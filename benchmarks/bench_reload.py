@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+"""
+Measures FileStorage.reload() and to_dict() over a large JSON file
+
+Usage: python3 -m benchmarks.bench_reload [size]  (default: 1000000)
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from models.base_model import format_time
+from models.engine.file_storage import FileStorage
+
+
+def write_file(path, size):
+    """writes a JSON file with size Review records"""
+    now = format_time(datetime.utcnow())
+    records = {}
+    for i in range(size):
+        review_id = str(uuid.uuid4())
+        records["Review." + review_id] = {
+            "__class__": "Review", "id": review_id, "created_at": now,
+            "updated_at": now, "place_id": "bench", "user_id": "bench",
+            "text": "bench"}
+    with open(path, "w") as f:
+        json.dump(records, f)
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    path = os.path.join(tempfile.mkdtemp(), "file.json")
+    write_file(path, size)
+    FileStorage._FileStorage__file_path = path
+    FileStorage._FileStorage__journal_path = path + ".log"
+    storage = FileStorage()
+    start = time.perf_counter()
+    storage.reload()
+    seconds = time.perf_counter() - start
+    print("reload:  {:8.3f} s {:>10.0f} objects/s".format(
+        seconds, size / seconds))
+    start = time.perf_counter()
+    for obj in storage.all().values():
+        obj.to_dict()
+    seconds = time.perf_counter() - start
+    print("to_dict: {:8.3f} s {:>10.0f} objects/s".format(
+        seconds, size / seconds))
+    os.remove(path)
@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+"""
+Measures FileStorage.save() after changing a single object in a large store
+
+Usage: python3 -m benchmarks.bench_save [size]  (default: 1000000)
+"""
+import os
+import sys
+import tempfile
+import time
+from models.base_model import BaseModel
+from models.engine.file_storage import FileStorage
+from models.review import Review
+
+calls = [0]
+to_dict = BaseModel.to_dict
+
+
+def counted_to_dict(self, *args, **kwargs):
+    """BaseModel.to_dict() that counts how many times it is called"""
+    calls[0] += 1
+    return to_dict(self, *args, **kwargs)
+
+
+def timed_save(storage, label):
+    """runs storage.save() and prints its duration and to_dict() calls"""
+    calls[0] = 0
+    start = time.perf_counter()
+    storage.save()
+    print("{:<24} {:8.3f} s {:>9} to_dict() calls".format(
+        label, time.perf_counter() - start, calls[0]))
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    path = os.path.join(tempfile.mkdtemp(), "file.json")
+    FileStorage._FileStorage__file_path = path
+    FileStorage._FileStorage__journal_path = path + ".log"
+    BaseModel.to_dict = counted_to_dict
+    storage = FileStorage()
+    for i in range(size):
+        storage.new(Review(place_id="bench", text="bench"))
+    timed_save(storage, "first save, all dirty")
+    review = Review(place_id="bench", text="bench")
+    storage.new(review)
+    timed_save(storage, "save after 1 new object")
+    review.text = "changed"
+    timed_save(storage, "save after 1 change")
+    os.remove(path)
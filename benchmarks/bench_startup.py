@@ -0,0 +1,41 @@
+#!/usr/bin/python3
+"""
+Measures the startup time and memory of a process importing `models`, for
+the JSON file (eager and lazy) and for the mmap'ed record file
+
+Usage: python3 -m benchmarks.bench_startup [size]  (default: 1000000)
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.bench_reload import write_file
+
+MODES = [("json", {}),
+         ("json, lazy", {"HBNB_FILE_LAZY": "1"}),
+         ("records", {"HBNB_FILE_FORMAT": "records"})]
+SCRIPT = ("import resource; from models import storage; storage.count(); "
+          "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)")
+
+
+def run(cwd, env, script=SCRIPT):
+    """runs script with python3 in cwd, returns (seconds, its output)"""
+    full_env = dict(os.environ, PYTHONPATH=os.getcwd(), **env)
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", script], cwd=cwd,
+                         env=full_env, check=True, stdout=subprocess.PIPE)
+    return time.perf_counter() - start, out.stdout
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    cwd = tempfile.mkdtemp()
+    write_file(os.path.join(cwd, "file.json"), size)
+    # converts file.json to the record file, read by the "records" mode
+    run(cwd, {"HBNB_FILE_FORMAT": "records"},
+        "from models import storage; storage.save()")
+    for name, env in MODES:
+        seconds, rss = run(cwd, env)
+        print("{:<12} {:8.3f} s {:10.1f} MB max RSS".format(
+            name, seconds, int(rss) / 1024))
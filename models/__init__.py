@@ -7,6 +7,9 @@ from os import getenv
 
 
 storage_t = getenv("HBNB_TYPE_STORAGE")
+# sqlite uses the same SQLAlchemy models and DBStorage as MySQL
+if storage_t == "sqlite":
+    storage_t = "db"
 
 if storage_t == "db":
     from models.engine.db_storage import DBStorage
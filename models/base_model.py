@@ -7,11 +7,31 @@ from datetime import datetime
 import models
 from os import getenv
 import sqlalchemy
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Index
+from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import declared_attr
 import uuid
 
 time = "%Y-%m-%dT%H:%M:%S.%f"
+# DATETIME(6) in MySQL, whose DATETIME drops the microseconds: the ETags
+# and the page cursors of the API need them to tell writes apart
+Timestamp = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
+
+def parse_time(value):
+    """parses a datetime saved in the `time` format"""
+    # fromisoformat() reads this format an order of magnitude faster than
+    # strptime(), which is only kept for pythons older than 3.7
+    try:
+        return datetime.fromisoformat(value)
+    except (AttributeError, ValueError):
+        return datetime.strptime(value, time)
+
+
+def format_time(value):
+    """formats a datetime in the `time` format, same as strftime(time)"""
+    return value.isoformat(timespec="microseconds")
 
 if models.storage_t == "db":
     Base = declarative_base()
@@ -23,29 +43,44 @@ class BaseModel:
     """The BaseModel class from which future classes will be derived"""
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
-        created_at = Column(DateTime, default=datetime.utcnow)
-        updated_at = Column(DateTime, default=datetime.utcnow)
+        created_at = Column(Timestamp, default=datetime.utcnow)
+        updated_at = Column(Timestamp, default=datetime.utcnow)
+
+        @declared_attr
+        def __table_args__(cls):
+            """index on (created_at, id), the order of DBStorage.page()"""
+            return (Index("ix_{}_created_at_id".format(cls.__tablename__),
+                          "created_at", "id"),)
 
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
+        # The new object is not in storage yet, so there is nothing to flag
+        # as dirty: set the attributes without going through __setattr__.
+        set_attr = super().__setattr__
         if kwargs:
             for key, value in kwargs.items():
                 if key != "__class__":
-                    setattr(self, key, value)
+                    set_attr(key, value)
             if kwargs.get("created_at", None) and type(self.created_at) is str:
-                self.created_at = datetime.strptime(kwargs["created_at"], time)
+                set_attr("created_at", parse_time(kwargs["created_at"]))
             else:
-                self.created_at = datetime.utcnow()
+                set_attr("created_at", datetime.utcnow())
             if kwargs.get("updated_at", None) and type(self.updated_at) is str:
-                self.updated_at = datetime.strptime(kwargs["updated_at"], time)
+                set_attr("updated_at", parse_time(kwargs["updated_at"]))
             else:
-                self.updated_at = datetime.utcnow()
+                set_attr("updated_at", datetime.utcnow())
             if kwargs.get("id", None) is None:
-                self.id = str(uuid.uuid4())
+                set_attr("id", str(uuid.uuid4()))
         else:
-            self.id = str(uuid.uuid4())
-            self.created_at = datetime.utcnow()
-            self.updated_at = self.created_at
+            set_attr("id", str(uuid.uuid4()))
+            set_attr("created_at", datetime.utcnow())
+            set_attr("updated_at", self.created_at)
+
+    if models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """sets an attribute and flags the instance as dirty in storage"""
+            super().__setattr__(name, value)
+            models.storage.touch(self, name)
 
     def __str__(self):
         """String representation of the BaseModel class"""
@@ -58,13 +93,17 @@ class BaseModel:
         models.storage.new(self)
         models.storage.save()
 
-    def to_dict(self):
-        """returns a dictionary containing all keys/values of the instance"""
+    def to_dict(self, format_times=True):
+        """
+        returns a dictionary containing all keys/values of the instance,
+        with format_times=False the datetimes are left to the JSON codec
+        """
         new_dict = self.__dict__.copy()
-        if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
-        if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
+        if format_times:
+            if "created_at" in new_dict:
+                new_dict["created_at"] = format_time(new_dict["created_at"])
+            if "updated_at" in new_dict:
+                new_dict["updated_at"] = format_time(new_dict["updated_at"])
         new_dict["__class__"] = self.__class__.__name__
         if "_sa_instance_state" in new_dict:
             del new_dict["_sa_instance_state"]
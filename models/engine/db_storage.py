@@ -3,96 +3,490 @@
 Contains the class DBStorage
 """
 
+import logging
 import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
 from models.city import City
+from models.engine.object_cache import ObjectCache
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from itertools import cycle
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import Column, Integer, MetaData, String, Table
+from sqlalchemy import and_, create_engine, event, func, insert, or_, select
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, scoped_session, selectinload
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from time import monotonic
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# checkouts that wait longer than HBNB_MYSQL_POOL_SLOW seconds for a
+# connection are logged as warnings, the others at debug level
+pool_slow = float(getenv("HBNB_MYSQL_POOL_SLOW", "0.1"))
+log = logging.getLogger(__name__)
+# PRAGMAs run on every SQLite connection: WAL lets the readers work while
+# a write is in progress, synchronous=NORMAL is still safe with WAL, and
+# busy_timeout (ms) waits for the lock instead of failing at once
+sqlite_pragmas = {"journal_mode": "WAL", "synchronous": "NORMAL",
+                  "foreign_keys": "ON", "busy_timeout": "5000",
+                  "cache_size": "-65536", "temp_store": "MEMORY",
+                  "mmap_size": "268435456"}
+
+
+# the version of each class (see DBStorage.version()), bumped in the same
+# transaction as the changes to its objects, whatever process makes them
+versions = Table("hbnb_versions", MetaData(),
+                 Column("name", String(60), primary_key=True),
+                 Column("version", Integer, nullable=False))
+
+
+def track_changes(session, flush_context):
+    """
+    after_flush listener: adds the (class name, id) of the objects the
+    flush wrote to session.info["changed"], for the next save()
+    """
+    changed = session.info.setdefault("changed", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        changed.add((type(obj).__name__, obj.id))
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that logs and adds up how long checkouts wait"""
+
+    def __init__(self, *args, **kwargs):
+        """Instantiate the pool with its wait counters at 0"""
+        super().__init__(*args, **kwargs)
+        # int - connections checked out of the pool
+        self.checkouts = 0
+        # float - seconds waited by all of them, and by the longest one
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        """checks a connection out, timing the wait for a free one"""
+        start = monotonic()
+        try:
+            return super()._do_get()
+        finally:
+            wait = monotonic() - start
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            if wait >= pool_slow:
+                log.warning("pool checkout waited %.3f s (%s)", wait,
+                            self.status())
+            else:
+                log.debug("pool checkout waited %.3f s", wait)
+
+
+def engine_options():
+    """
+    returns the pool arguments of create_engine() set by HBNB_MYSQL_POOL_SIZE,
+    HBNB_MYSQL_MAX_OVERFLOW, HBNB_MYSQL_POOL_TIMEOUT (seconds to wait for a
+    connection), HBNB_MYSQL_POOL_RECYCLE (seconds a connection is kept,
+    default 3600) and HBNB_MYSQL_POOL_PRE_PING (1, the default, or 0)
+    """
+    options = {
+        "pool_recycle": int(getenv("HBNB_MYSQL_POOL_RECYCLE", "3600")),
+        "pool_pre_ping": getenv("HBNB_MYSQL_POOL_PRE_PING", "1") == "1"}
+    for name, var, kind in (("pool_size", "HBNB_MYSQL_POOL_SIZE", int),
+                            ("max_overflow", "HBNB_MYSQL_MAX_OVERFLOW", int),
+                            ("pool_timeout", "HBNB_MYSQL_POOL_TIMEOUT",
+                             float)):
+        if getenv(var):
+            options[name] = kind(getenv(var))
+    return options
+
+
+def make_engine(url, **options):
+    """returns the engine of url, pooled by a TimedQueuePool"""
+    return create_engine(url, poolclass=TimedQueuePool, **options)
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """runs sqlite_pragmas on a new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas.items():
+        cursor.execute("PRAGMA {} = {}".format(name, value))
+    cursor.close()
+
+
+def sqlite_url(path, shared_cache=False):
+    """
+    returns the URL of the SQLite database in the file path, opened with
+    a cache shared by all its connections in the process if shared_cache
+    """
+    if shared_cache:
+        return "sqlite:///file:{}?cache=shared&uri=true".format(path)
+    return "sqlite:///" + path
+
+
+def database_url(host):
+    """returns the URL of the HBNB_MYSQL_DB database on host"""
+    return 'mysql+mysqldb://{}:{}@{}/{}'.format(getenv('HBNB_MYSQL_USER'),
+                                                getenv('HBNB_MYSQL_PWD'),
+                                                host,
+                                                getenv('HBNB_MYSQL_DB'))
+
+
+class RoutingSession(Session):
+    """
+    Session that sends its reads to one of the replicas, taken in turns
+    from replicas (an itertools.cycle of engines) when it is created, and
+    its writes to the primary engine. Once it has written, or been told
+    it will by setting info["primary"], it reads from the primary too
+    (read-your-writes) until it is closed.
+    """
+
+    def __init__(self, replicas=None, **kwargs):
+        """Instantiate the session with its replica for the reads"""
+        super().__init__(**kwargs)
+        self.replica = next(replicas) if replicas is not None else None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        """returns the engine the statement clause is run on"""
+        if kwargs.get("bind") is not None:
+            return kwargs["bind"]
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info["primary"] = True
+        if self.replica is None or self.info.get("primary"):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return self.replica
 
 
 class DBStorage:
-    """interaacts with the MySQL database"""
+    """
+    interaacts with the MySQL database, or with the SQLite file
+    HBNB_SQLITE_PATH when HBNB_TYPE_STORAGE is sqlite
+    """
     __engine = None
     __session = None
+    # list - engines of HBNB_MYSQL_REPLICA_HOSTS, the reads go to them
+    __replicas = []
+    # ObjectCache - objects read by get(), None without HBNB_CACHE_SIZE
+    __cache = None
 
     def __init__(self):
         """Instantiate a DBStorage object"""
-        HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
-        HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
-        HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
+        HBNB_MYSQL_REPLICA_HOSTS = getenv('HBNB_MYSQL_REPLICA_HOSTS', '')
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        if getenv('HBNB_TYPE_STORAGE') == 'sqlite':
+            self.__engine = make_engine(
+                sqlite_url(getenv('HBNB_SQLITE_PATH', 'hbnb.db'),
+                           getenv('HBNB_SQLITE_SHARED_CACHE') == '1'),
+                **engine_options())
+            event.listen(self.__engine, "connect", set_sqlite_pragmas)
+            # un solo archivo, sin replicas
+            HBNB_MYSQL_REPLICA_HOSTS = ''
+        else:
+            self.__engine = make_engine(database_url(HBNB_MYSQL_HOST),
+                                        **engine_options())
+        # comma separated, e.g. "replica1,replica2:3307"
+        self.__replicas = [make_engine(database_url(host.strip()),
+                                       **engine_options())
+                           for host in HBNB_MYSQL_REPLICA_HOSTS.split(',')
+                           if host.strip()]
+        # HBNB_CACHE_TTL: seconds an object is kept (default 60, 0 for
+        # no limit), bounds how stale the writes of other processes look
+        if int(getenv('HBNB_CACHE_SIZE', '0')) > 0:
+            ttl = float(getenv('HBNB_CACHE_TTL', '60'))
+            self.__cache = ObjectCache(int(getenv('HBNB_CACHE_SIZE')),
+                                       ttl or None)
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
+            versions.metadata.drop_all(self.__engine)
+
+    def all(self, cls=None, load=()):
+        """
+        query on the current database session. load names relationships of
+        cls to fetch along with the objects, e.g. ("cities",) for State or
+        ("places.reviews",), with one SELECT ... IN per relationship instead
+        of one query per object when they are walked
+        """
+        objs = {}
+        for query in self.__queries(cls, load):
+            for obj in query.all():
+                objs[type(obj).__name__ + '.' + obj.id] = obj
+        return objs
+
+    def iter_all(self, cls=None, load=(), batch_size=1000):
+        """
+        yields the objects of cls (of every class if None) as they are read,
+        batch_size rows at a time (yield_per), instead of holding every row
+        in memory. load is the same as in all(), its rows are all read at
+        once: the SELECT ... IN it runs can not share the connection with
+        the server side cursor yield_per keeps open on MySQL
+        """
+        for query in self.__queries(cls, load):
+            for obj in query.all() if load else query.yield_per(batch_size):
+                yield obj
+
+    def __queries(self, cls, load):
+        """returns the queries of the objects of cls, one per class if None"""
+        if isinstance(cls, str):
+            cls = classes.get(cls, cls)
+        if cls is not None and cls not in classes.values():
+            return []
+        if cls is None:
+            return [self.__session.query(clss) for clss in classes.values()]
+        return [self.__session.query(cls).options(
+            *self.__load(cls, load, selectinload))]
+
+    def page(self, cls, limit, after=None, **filters):
+        """
+        Returns up to limit objects of cls in (created_at, id) order,
+        starting after the (created_at, id) pair after. filters restrict
+        the objects to a parent, e.g. page(City, 10, state_id=...)
+        """
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return []
+        query = self.__session.query(cls).filter_by(**filters)
+        return self.__page(query, cls, limit, after)
+
+    def search_places(self, states=(), cities=(), amenities=(), limit=None,
+                      after=None):
+        """
+        Returns the places in the cities listed or in the cities of the
+        states listed (every place if there are none) that have all the
+        amenities listed, up to limit of them in (created_at, id) order
+        starting after the (created_at, id) pair after
+        """
+        query = self.__session.query(Place)
+        if states or cities:
+            # places JOIN cities, the index on cities.state_id does the rest
+            query = query.join(City, Place.city_id == City.id).filter(
+                or_(City.state_id.in_(list(states)),
+                    City.id.in_(list(cities))))
+        if amenities:
+            # places linked to every one of the amenities
+            links = models.place.place_amenity
+            amenities = set(amenities)
+            query = query.filter(Place.id.in_(
+                select(links.c.place_id).
+                where(links.c.amenity_id.in_(amenities)).
+                group_by(links.c.place_id).
+                having(func.count() == len(amenities))))
+        return self.__page(query, Place, limit, after)
 
-    def all(self, cls=None):
-        """query on the current database session"""
-        new_dict = {}
-        for clss in classes:
-            if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
-                for obj in objs:
-                    key = obj.__class__.__name__ + '.' + obj.id
-                    new_dict[key] = obj
-        return (new_dict)
+    def __insert(self, objects):
+        """inserts and commits the rows of objects, grouped by class"""
+        rows = {}
+        for obj in objects:
+            table = type(obj).__table__
+            row = {}
+            for column in table.columns:
+                value = getattr(obj, column.key, None)
+                # lo mismo que haria el INSERT del ORM con los default
+                if value is None and column.default is not None and \
+                        column.default.is_scalar:
+                    value = column.default.arg
+                row[column.key] = value
+            rows.setdefault(type(obj), []).append(row)
+        for cls, cls_rows in rows.items():
+            self.__session.execute(insert(cls.__table__), cls_rows)
+        self.__bump([cls.__name__ for cls in rows])
+        self.__session.commit()
+
+    def __bump(self, names):
+        """adds 1 to the versions of the classes names, before the commit"""
+        if names:
+            self.__session.execute(
+                update(versions).where(versions.c.name.in_(set(names))).
+                values(version=versions.c.version + 1))
+
+    def __load(self, cls, load, loader):
+        """
+        returns the loader options (selectinload or joinedload) of the
+        relationship paths in load, e.g. "places" or "places.reviews"
+        """
+        options = []
+        for path in load:
+            option = None
+            owner = cls
+            for name in path.split("."):
+                attr = getattr(owner, name)
+                if option is None:
+                    option = loader(attr)
+                else:
+                    option = getattr(option, loader.__name__)(attr)
+                owner = attr.property.mapper.class_
+            options.append(option)
+        return options
+
+    def __page(self, query, cls, limit, after):
+        """orders query by (created_at, id), applies the cursor and limit"""
+        if after is not None:
+            created_at, id = after
+            query = query.filter(or_(cls.created_at > created_at,
+                                     and_(cls.created_at == created_at,
+                                          cls.id > id)))
+        query = query.order_by(cls.created_at, cls.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def __forget(self, keys):
+        """removes the (class name, id) keys from the object cache"""
+        if self.__cache is not None:
+            for key in keys:
+                self.__cache.pop(key)
 
     def new(self, obj):
         """add the object to the current database session"""
+        self.__session.info["primary"] = True
+        self.__forget([(type(obj).__name__, obj.id)])
         self.__session.add(obj)
 
+    def bulk_new(self, objects, batch_size=10000):
+        """
+        inserts objects with one executemany INSERT per class and commits
+        every batch_size objects. Only the columns are written (not the
+        relationships) and the objects are not added to the session
+        """
+        self.__session.info["primary"] = True
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) == batch_size:
+                self.__insert(batch)
+                batch = []
+        if batch:
+            self.__insert(batch)
+
     def save(self):
         """commit all changes of the current database session"""
-        self.__session.commit()
+        session = self.__session
+        session.info["primary"] = True
+        # lo que escribio un autoflush antes tambien queda en "changed"
+        session.flush()
+        changed = session.info.pop("changed", set())
+        self.__bump([name for name, id in changed])
+        session.commit()
+        self.__forget(changed)
+
+    def rollback(self):
+        """rolls back all changes of the current database session"""
+        self.__session.info.pop("changed", None)
+        self.__session.rollback()
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
+            self.__session.info["primary"] = True
+            self.__forget([(type(obj).__name__, obj.id)])
             self.__session.delete(obj)
 
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
-        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        versions.metadata.create_all(self.__engine)
+        try:
+            with self.__engine.begin() as conn:
+                found = set(conn.execute(select(versions.c.name)).scalars())
+                missing = [{"name": name, "version": 0} for name in classes
+                           if name not in found]
+                if missing:
+                    conn.execute(insert(versions), missing)
+        except IntegrityError:
+            # otro proceso las agrego al mismo tiempo
+            pass
+        # sin replicas todo va al primario, como antes
+        replicas = cycle(self.__replicas) if self.__replicas else None
+        sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False,
+                                    class_=RoutingSession, replicas=replicas)
+        event.listen(sess_factory, "after_flush", track_changes)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
     def close(self):
-        """call remove() method on the private session attribute"""
+        """
+        call remove() method on the private session attribute, the next
+        session reads from the next replica
+        """
         self.__session.remove()
 
-    def get(self, cls, id):
+    def get(self, cls, id, load=()):
         """
         Returns the object based on the class and its ID, or None if not found
+        load names relationships to fetch in the same query (JOIN), as in all()
         """
-        # Guardo los objetos de la clase que se pase como argumento usando el
-        # metodo all() que habiamos creado anteriormente.
-        objects = self.all(cls)
-
         if cls is None or id is None:
             return None
-        else:
-            for key, value in objects.items():
-                # Si las ID coinciden se retorna el value que es la
-                # representacion del string del objeto
-                if objects[key].id == id:
-                    return value
-            # Se retorna None en caso que no coincidan las IDs
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls not in classes.values():
             return None
+        if self.__cache is not None and not load:
+            return self.__cached_get(cls, id)
+        # Primary key lookup, answered from the session identity map when the
+        # object is already loaded and with a single SELECT otherwise.
+        return self.__session.get(cls, id,
+                                  options=self.__load(cls, load, joinedload))
+
+    def __cached_get(self, cls, id):
+        """
+        get() through the object cache. The objects the session already
+        holds are returned as they are, changes included. The misses are
+        read from the primary, so the cache never keeps what a lagging
+        replica answered
+        """
+        obj = self.__session.identity_map.get(identity_key(cls, id))
+        if obj is not None:
+            return obj
+        key = (cls.__name__, id)
+        cached = self.__cache.get(key)
+        if cached is not None:
+            # a copy of cached in the current session, without any SELECT
+            return self.__session.merge(cached, load=False)
+        obj = self.__session.get(cls, id,
+                                 bind_arguments={"bind": self.__engine})
+        if obj is not None:
+            # the cache keeps a detached copy of the columns, so the changes
+            # made to obj in this session do not reach the other ones
+            cached = cls.__mapper__.class_manager.new_instance()
+            for column in cls.__table__.columns:
+                setattr(cached, column.key, getattr(obj, column.key))
+            make_transient_to_detached(cached)
+            self.__cache.put(key, cached)
+        return obj
+
+    def cache_stats(self):
+        """
+        Returns the hits, misses and evictions of the object cache and the
+        number of objects in it, or None if there is no cache
+        """
+        if self.__cache is None:
+            return None
+        return self.__cache.stats()
+
+    def get_many(self, cls, ids):
+        """
+        Returns the objects of cls whose ID is in ids, in the order of ids,
+        leaving out the ids that are not found
+        """
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return []
+        ids = list(ids)
+        if not ids:
+            return []
+        # a single SELECT ... WHERE id IN (...) for all the ids
+        found = {obj.id: obj for obj in
+                 self.__session.query(cls).filter(cls.id.in_(ids)).all()}
+        return [found[id] for id in ids if id in found]
 
     def count(self, cls=None):
         """
@@ -100,17 +494,35 @@ class DBStorage:
         Returns the number of objects in storage matching the given class.
         If no class is passed, returns the count of all objects in storage.
         """
-        # Traigo todos los objetos
-        objects = self.all()
-        # Creo variable contadora y se setea en 0
-        cont = 0
-
         if cls is None:
-            for key, value in objects.items():
-                cont += 1
-            return cont
-        else:
-            # Si no es None es porque se paso una clase por lo tanto llamamos
-            # al metodo all y usamos len para traer la cantidad de la clase
-            # especifica que se pase en "cls"
-            return len(self.all(cls))
+            return sum(self.count_all().values())
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return 0
+        # SELECT COUNT(*) FROM <table>, without loading any row
+        return self.__session.query(func.count(cls.id)).scalar()
+
+    def count_all(self):
+        """
+        Returns {<class name>: number of objects} for every class, fetched in
+        a single round trip (one SELECT of a COUNT(*) subquery per table).
+        """
+        counts = [select(func.count()).select_from(classes[name]).
+                  scalar_subquery().label(name) for name in classes]
+        row = self.__session.execute(select(*counts)).one()
+        return dict(zip(classes, row))
+
+    def version(self, cls):
+        """
+        Returns the version of cls, a number that changes whenever one of its
+        objects is added, changed or deleted through a DBStorage, in this
+        process or in another one. A single primary key lookup.
+        """
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return None
+        return self.__session.execute(
+            select(versions.c.version).
+            where(versions.c.name == cls.__name__)).scalar()
@@ -3,7 +3,14 @@
 Contains the FileStorage class
 """
 
-import json
+from bisect import bisect_left, bisect_right, insort
+from fcntl import LOCK_EX, flock
+from os import getenv, remove, replace, stat
+from threading import Lock
+from uuid import uuid4
+from models.engine.json_codec import dumps, loads, native_datetimes
+from models.engine.record_file import read_record, read_records
+from models.engine.record_file import record_text, write_records
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -14,6 +21,10 @@ from models.user import User
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# attributes that hold the id of a parent object, indexed by FileStorage
+foreign_keys = ("state_id", "city_id", "place_id", "user_id")
+# attributes that hold a list of parent ids, indexed under each of them
+multi_keys = ("amenity_ids",)
 
 
 class FileStorage:
@@ -21,72 +32,557 @@ class FileStorage:
 
     # string - path to the JSON file
     __file_path = "file.json"
+    # string - path to the offset-indexed record file (see record_file.py)
+    __records_path = __file_path + ".rec"
+    # string - path to the journal appended to by save() in journal mode
+    __journal_path = __file_path + ".log"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects partitioned by class name, so that the
+    # per-class queries only walk the objects of the class they ask for
+    __by_class = {}
+    # dictionary - <class name>.id of the objects added or changed (obj) or
+    # deleted (None) since the last save(), i.e. the dirty objects
+    __pending = {}
+    # dictionary - records read from disk but not turned into objects yet
+    # (lazy mode), by class name: {<class name>: {<class name>.id: dict}},
+    # or (mmap, offset, length) when they come from the record file
+    __raw = {}
+    # Lock - held while raw records are turned into objects
+    __lock = Lock()
+    # dictionary - reverse indexes on the foreign keys: maps
+    # (<class name>, <foreign key>, <parent id>) to {<class name>.id: obj}
+    # of the children, so relationships resolve without a full scan
+    __fk_index = {}
+    # dictionary - <class name>.id: {<foreign key>: <parent id>} as indexed
+    __fk_values = {}
+    # dictionary - <class name>, or (<class name>, <foreign key>, <parent
+    # id>) for the children of a parent: sorted list of the (created_at, id)
+    # of the objects, built by the first page() that needs it and kept
+    # sorted as the objects are added, changed and deleted after that
+    __order = {}
+    # dictionary - <class name>.id: ((created_at, id), names in __order of
+    # the sorted lists it is in)
+    __sorted = {}
+    # dictionary - <class name>: number of changes made to its objects, the
+    # version of the class returned by version()
+    __versions = {}
+    # string - different in every process, part of the versions so that a
+    # restarted process does not hand out the versions of the previous one
+    __nonce = uuid4().hex
+    # dictionary - JSON text of each object as of its last save(), so that
+    # save() only has to serialize the dirty objects again
+    __encoded = {}
+    # tuple - (mtime, size, inode) of the JSON file the last time it was read
+    # or written, so close() can tell whether it changed since then
+    __file_stamp = None
+    # bool - HBNB_FILE_RELOAD=0 turns off the reload done by close() after
+    # each request, for deployments where only this process writes the file
+    __reload_on_close = getenv("HBNB_FILE_RELOAD", "1") != "0"
+    # bool - HBNB_FILE_JOURNAL=1 makes save() append the pending changes to
+    # the journal instead of rewriting the whole JSON file
+    __journal = getenv("HBNB_FILE_JOURNAL") == "1"
+    # int - records in the journal, folded into the JSON file (compaction)
+    # once there are HBNB_FILE_JOURNAL_MAX of them
+    __journal_len = 0
+    __journal_max = int(getenv("HBNB_FILE_JOURNAL_MAX", "10000"))
+    # bool - HBNB_FILE_LAZY=1 makes reload() keep the records it reads as
+    # they are, each one is turned into an object the first time it is used
+    __lazy = getenv("HBNB_FILE_LAZY") == "1"
+    # string - HBNB_FILE_FORMAT=records saves to the mmap'ed record file
+    # instead of the JSON file, reading it is always lazy
+    __format = getenv("HBNB_FILE_FORMAT", "json")
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
+    def all(self, cls=None, load=()):
+        """
+        returns the dictionary __objects. load is there for DBStorage
+        compatibility, relationships are resolved from the indexes here
+        """
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            self.__materialize(cls)
+            return dict(self.__bucket(cls))
+        for cls_name in list(self.__raw):
+            self.__materialize(cls_name)
         return self.__objects
 
+    def iter_all(self, cls=None, load=()):
+        """
+        yields the objects of cls (of every class if None) without copying
+        them to a new dictionary, load is ignored as in all()
+        """
+        if cls is not None:
+            self.__materialize(cls)
+            objs = self.__bucket(cls).values()
+        else:
+            objs = self.all().values()
+        # list() so that objects can be added or deleted while iterating
+        for obj in list(objs):
+            yield obj
+
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
-            key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            key = self.__put(obj)
+            self.__pending[key] = obj
+            self.__bump(key)
+
+    def bulk_new(self, objects):
+        """sets every one of objects in __objects and saves them once"""
+        for obj in objects:
+            self.new(obj)
+        self.save()
+
+    def touch(self, obj, name=None):
+        """
+        flags obj as dirty, called by BaseModel whenever an attribute is set.
+        Changes made in place (e.g. appending to a list attribute) are not
+        seen, assign the attribute again so that they get saved.
+        """
+        obj_id = obj.__dict__.get("id")
+        if obj_id is None:
+            return
+        key = obj.__class__.__name__ + "." + obj_id
+        # objects being built by reload() are not in __objects yet
+        if self.__objects.get(key) is obj:
+            self.__pending[key] = obj
+            self.__encoded.pop(key, None)
+            self.__bump(key)
+            if name is None or name in foreign_keys or name in multi_keys:
+                self.__index(key, obj)
+            if name is None or name == "created_at" or \
+                    name in foreign_keys or name in multi_keys:
+                self.__reorder(key, obj)
+
+    def related(self, cls, fk, id):
+        """
+        Returns the list of objects of cls whose foreign key fk (state_id,
+        city_id, place_id or user_id) is id, e.g. the cities of a state, or
+        whose list of ids fk (amenity_ids) holds id
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__materialize(cls)
+        return list(self.__fk_index.get((cls, fk, id), {}).values())
+
+    def page(self, cls, limit, after=None, **filters):
+        """
+        Returns up to limit objects of cls in (created_at, id) order,
+        starting after the (created_at, id) pair after. filters restrict
+        the objects to a parent, e.g. page(City, 10, state_id=...)
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        # the records not read yet are added to the sorted lists as well
+        self.__materialize(cls)
+        if filters:
+            # the children of the parent of the first filter
+            fk = next(iter(filters))
+            name = (cls, fk, filters[fk])
+        else:
+            name = cls
+        order = self.__order.get(name)
+        if order is None:
+            if filters:
+                objs = self.related(cls, fk, filters[fk])
+            else:
+                objs = list(self.__bucket(cls).values())
+            order = self.__sort(name, objs)
+        index = bisect_right(order, after) if after is not None else 0
+        bucket = self.__bucket(cls)
+        page = []
+        while len(page) < limit and index < len(order):
+            obj = bucket.get(cls + "." + order[index][1])
+            index += 1
+            if obj is not None and all(getattr(obj, name) == value
+                                       for name, value in filters.items()):
+                page.append(obj)
+        return page
+
+    def search_places(self, states=(), cities=(), amenities=(), limit=None,
+                      after=None):
+        """
+        Returns the places in the cities listed or in the cities of the
+        states listed (every place if there are none) that have all the
+        amenities listed, up to limit of them in (created_at, id) order
+        starting after the (created_at, id) pair after
+        """
+        if not (states or cities or amenities):
+            return self.page("Place", limit or self.count("Place"), after)
+        matches = None
+        if states or cities:
+            # state -> cities -> places, through the foreign key indexes
+            city_ids = set(cities)
+            for state_id in states:
+                city_ids.update(city.id for city in
+                                self.related("City", "state_id", state_id))
+            matches = {}
+            for city_id in city_ids:
+                for place in self.related("Place", "city_id", city_id):
+                    matches[place.id] = place
+        # amenity -> places, intersected starting with the smallest set so
+        # places that cannot match are dropped as early as possible
+        with_amenity = sorted(({place.id: place for place in
+                                self.related("Place", "amenity_ids", id)}
+                               for id in set(amenities)), key=len)
+        for places in with_amenity:
+            if matches is None:
+                matches = places
+            else:
+                small, big = sorted((matches, places), key=len)
+                matches = {id: place for id, place in small.items()
+                           if id in big}
+            if not matches:
+                return []
+        order = sorted((place.created_at, id) for id, place in
+                       matches.items())
+        start = bisect_right(order, after) if after is not None else 0
+        end = start + limit if limit is not None else len(order)
+        return [matches[id] for created_at, id in order[start:end]]
 
     def save(self):
         """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        if self.__journal:
+            self.__append_journal()
+        else:
+            self.__write_snapshot()
+        FileStorage.__file_stamp = self.__stamp()
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
+        """deserializes the JSON file and replays its journal to __objects"""
+        stamp = self.__stamp()
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
+            # the JSON file is still read when there is no record file yet
+            if self.__format == "records" and stamp[1] is not None:
+                mm, index = read_records(self.__records_path)
+                for key, (offset, length) in index.items():
+                    self.__load(key, (mm, offset, length))
+            else:
+                with open(self.__file_path, 'r', encoding="utf-8") as f:
+                    jo = loads(f.read())
+                for key in jo:
+                    self.__load(key, jo[key])
         except Exception:
             pass
+        self.__replay_journal()
+        FileStorage.__file_stamp = stamp
+
+    def rollback(self):
+        """
+        drops the changes made since the last save(): the objects they
+        touched are read back from disk, or removed if they were never saved
+        """
+        for key in list(self.__pending):
+            self.__pop(key)
+        self.__pending.clear()
+        self.reload()
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
             if key in self.__objects:
-                del self.__objects[key]
+                self.__pop(key)
+                self.__pending[key] = None
+
+    def __put(self, obj):
+        """stores obj in __objects and its class bucket, returns its key"""
+        cls_name = obj.__class__.__name__
+        key = cls_name + "." + obj.id
+        self.__raw.get(cls_name, {}).pop(key, None)
+        self.__objects[key] = obj
+        self.__by_class.setdefault(cls_name, {})[key] = obj
+        self.__encoded.pop(key, None)
+        self.__index(key, obj)
+        self.__reorder(key, obj)
+        return key
+
+    def __load(self, key, record):
+        """stores a record read from disk, left as a dict in lazy mode"""
+        self.__bump(key)
+        if self.__lazy or type(record) is tuple:
+            if key in self.__objects:
+                self.__pop(key)
+            cls_name = key.split(".", 1)[0]
+            self.__raw.setdefault(cls_name, {})[key] = record
+        else:
+            self.__put(classes[record["__class__"]](**record))
+
+    def __materialize(self, cls, key=None):
+        """turns the raw records of cls (or only key) into objects"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        if not self.__raw.get(cls):
+            return
+        with self.__lock:
+            raw = self.__raw.get(cls, {})
+            keys = list(raw) if key is None else [key]
+            for key in keys:
+                record = raw.pop(key, None)
+                if type(record) is tuple:
+                    record = read_record(record)
+                if record is not None:
+                    self.__put(classes[record["__class__"]](**record))
+
+    def __pop(self, key):
+        """removes the object stored under key, if any"""
+        cls_name = key.split(".", 1)[0]
+        self.__raw.get(cls_name, {}).pop(key, None)
+        self.__reorder(key, None)
+        self.__bump(key)
+        if self.__objects.pop(key, None) is not None:
+            self.__by_class.get(cls_name, {}).pop(key, None)
+            self.__encoded.pop(key, None)
+            self.__index(key, None)
+
+    def __bump(self, key):
+        """counts a change to the class of the object stored under key"""
+        cls_name = key.split(".", 1)[0]
+        self.__versions[cls_name] = self.__versions.get(cls_name, 0) + 1
+
+    def __index(self, key, obj):
+        """moves key to the reverse indexes of the foreign keys of obj"""
+        cls_name = key.split(".", 1)[0]
+        for fk, value in self.__fk_values.pop(key, {}).items():
+            for parent_id in value if fk in multi_keys else (value,):
+                children = self.__fk_index.get((cls_name, fk, parent_id))
+                if children is not None:
+                    children.pop(key, None)
+                    if not children:
+                        del self.__fk_index[(cls_name, fk, parent_id)]
+        if obj is None:
+            return
+        values = {}
+        for fk in foreign_keys + multi_keys:
+            value = getattr(obj, fk, None)
+            if not value:
+                continue
+            if fk in multi_keys:
+                # a copy, the list of obj can change before it is indexed again
+                value = tuple(value)
+            values[fk] = value
+            for parent_id in value if fk in multi_keys else (value,):
+                children = self.__fk_index.setdefault(
+                    (cls_name, fk, parent_id), {})
+                children[key] = obj
+        if values:
+            self.__fk_values[key] = values
+
+    def __sort(self, name, objs):
+        """builds the sorted list of __order name out of objs"""
+        order = []
+        for obj in objs:
+            key = obj.__class__.__name__ + "." + obj.id
+            entry = (obj.created_at, obj.id)
+            names = self.__sorted.get(key, (None, ()))[1]
+            if name not in names:
+                names += (name,)
+            self.__sorted[key] = (entry, names)
+            order.append(entry)
+        order.sort()
+        self.__order[name] = order
+        return order
+
+    def __reorder(self, key, obj):
+        """
+        moves key to its place in the sorted lists of __order, called after
+        obj (None if deleted) is indexed again
+        """
+        cls_name = key.split(".", 1)[0]
+        entry, names = self.__sorted.pop(key, (None, ()))
+        new_entry = new_names = ()
+        if obj is not None and self.__order:
+            new_entry = (obj.created_at, obj.id)
+            new_names = [cls_name]
+            for fk, value in self.__fk_values.get(key, {}).items():
+                for parent_id in value if fk in multi_keys else (value,):
+                    new_names.append((cls_name, fk, parent_id))
+            new_names = tuple(name for name in new_names
+                              if name in self.__order)
+        # only the lists it moves in, out of or within are changed
+        for name in names:
+            order = self.__order.get(name)
+            if order is None or (entry == new_entry and name in new_names):
+                continue
+            index = bisect_left(order, entry)
+            if index < len(order) and order[index] == entry:
+                del order[index]
+            if not order and name != cls_name and name not in new_names:
+                del self.__order[name]
+        for name in new_names:
+            if entry != new_entry or name not in names:
+                insort(self.__order[name], new_entry)
+        if new_names:
+            self.__sorted[key] = (new_entry, new_names)
+
+    def __bucket(self, cls):
+        """returns the {<class name>.id: obj} dictionary of a single class"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return self.__by_class.get(cls, {})
+
+    def __encode(self, key, obj):
+        """returns the JSON text of obj, serializing it only when dirty"""
+        if type(obj) is tuple:
+            return record_text(obj)
+        text = self.__encoded.get(key)
+        if text is None:
+            if type(obj) is not dict:
+                obj = obj.to_dict(format_times=not native_datetimes)
+            text = dumps(obj)
+            self.__encoded[key] = text
+        return text
+
+    def __write_snapshot(self):
+        """writes every object to the JSON file and empties the journal"""
+        items = []
+        for key, obj in self.__objects.items():
+            items.append((key, self.__encode(key, obj)))
+        for raw in list(self.__raw.values()):
+            for key, record in list(raw.items()):
+                items.append((key, self.__encode(key, record)))
+        if self.__format == "records":
+            write_records(self.__records_path, items)
+            self.__remap()
+        else:
+            # the {key: to_dict()} dictionary as JSON, put together from
+            # the cached JSON text of the unchanged objects
+            with open(self.__file_path + ".tmp", 'w', encoding="utf-8") as f:
+                f.write("{" + ", ".join(dumps(key) + ": " + text
+                                        for key, text in items) + "}")
+            replace(self.__file_path + ".tmp", self.__file_path)
+        try:
+            remove(self.__journal_path)
+        except OSError:
+            pass
+        self.__pending.clear()
+        FileStorage.__journal_len = 0
+
+    def __remap(self):
+        """points the raw records at the record file that was just written"""
+        if not any(self.__raw.values()):
+            return
+        mm, index = read_records(self.__records_path)
+        for raw in list(self.__raw.values()):
+            for key, record in list(raw.items()):
+                if type(record) is tuple:
+                    raw[key] = (mm, index[key][0], index[key][1])
+
+    def __append_journal(self):
+        """appends one JSON line per pending change to the journal"""
+        if not self.__pending:
+            return
+        lines = []
+        for key, obj in self.__pending.items():
+            if obj is None:
+                lines.append('{"op": "delete", "key": ' + dumps(key) +
+                             '}\n')
+            else:
+                lines.append('{"op": "put", "key": ' + dumps(key) +
+                             ', "obj": ' + self.__encode(key, obj) + '}\n')
+        with open(self.__journal_path, 'a+b') as f:
+            # save() in other processes appends under the same lock, so a
+            # last line without its "\n" was left by one that was interrupted
+            flock(f, LOCK_EX)
+            self.__cut_torn_line(f)
+            f.write("".join(lines).encode("utf-8"))
+        self.__pending.clear()
+        FileStorage.__journal_len += len(lines)
+        if self.__journal_len >= self.__journal_max:
+            self.__write_snapshot()
+
+    def __cut_torn_line(self, f):
+        """truncates the open journal f after its last complete line"""
+        end = f.seek(0, 2)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        while end > 0:
+            start = max(0, end - 4096)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline != -1:
+                end = start + newline + 1
+                break
+            end = start
+        f.truncate(end)
+
+    def __replay_journal(self):
+        """applies the records of the journal on top of __objects"""
+        count = 0
+        try:
+            with open(self.__journal_path, 'rb') as f:
+                for number, line in enumerate(f, 1):
+                    # a last line without its "\n" is still being written,
+                    # or was torn by a crash and is cut off by the next save()
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = loads(line.decode("utf-8"))
+                    except ValueError:
+                        raise ValueError("{}: line {} is not a valid record"
+                                         .format(self.__journal_path, number))
+                    if record["op"] == "put":
+                        self.__load(record["key"], record["obj"])
+                    else:
+                        self.__pop(record["key"])
+                    count += 1
+        except OSError:
+            return
+        FileStorage.__journal_len = count
+
+    def __stamp(self):
+        """returns (mtime, size, inode) of the saved files and the journal"""
+        stamps = []
+        for path in (self.__file_path, self.__records_path,
+                     self.__journal_path):
+            try:
+                st = stat(path)
+                stamps.append((st.st_mtime_ns, st.st_size, st.st_ino))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """call reload() method if the JSON file changed since last read"""
+        if not self.__reload_on_close:
+            return
+        if self.__stamp() != self.__file_stamp:
+            self.reload()
 
-    def get(self, cls, id):
+    def get(self, cls, id, load=()):
         """
         Returns the object based on the class and its ID, or None if not found
+        (load is ignored, see all())
         """
-        # Guardo los objetos de la clase que se pase como argumento usando el
-        # metodo all() que habiamos creado anteriormente.
-        objects = self.all(cls)
-
         if cls is None or id is None:
             return None
-        else:
-            for key, value in objects.items():
-                # Si las ID coinciden se retorna el value que es la
-                # representacion del string del objeto
-                if objects[key].id == id:
-                    return value
-            # Se retorna None en caso que no coincidan las IDs
-            return None
+        # The keys of __objects are already "<class name>.id", so the object
+        # can be looked up directly instead of scanning every object.
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        key = cls + "." + id
+        if key not in self.__objects:
+            self.__materialize(cls, key)
+        return self.__objects.get(key)
+
+    def get_many(self, cls, ids):
+        """
+        Returns the objects of cls whose ID is in ids, in the order of ids,
+        leaving out the ids that are not found
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        objs = []
+        for id in ids:
+            key = cls + "." + id
+            if key not in self.__objects:
+                self.__materialize(cls, key)
+            obj = self.__objects.get(key)
+            if obj is not None:
+                objs.append(obj)
+        return objs
 
     def count(self, cls=None):
         """
@@ -94,17 +590,21 @@ class FileStorage:
         Returns the number of objects in storage matching the given class.
         If no class is passed, returns the count of all objects in storage.
         """
-        # Traigo todos los objetos
-        objects = self.all()
-        # Creo variable contadora y se setea en 0
-        cont = 0
-
         if cls is None:
-            for key, value in objects.items():
-                cont += 1
-            return cont
-        else:
-            # Si no es None es porque se paso una clase por lo tanto llamamos
-            # al metodo all y usamos len para traer la cantidad de la clase
-            # especifica que se pase en "cls"
-            return len(self.all(cls))
+            return len(self.__objects) + sum(map(len, self.__raw.values()))
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return len(self.__bucket(cls)) + len(self.__raw.get(cls, {}))
+
+    def count_all(self):
+        """returns {<class name>: number of objects} for every class"""
+        return {name: self.count(name) for name in classes}
+
+    def version(self, cls):
+        """
+        returns the version of cls, a string that changes whenever one of
+        its objects is added, changed or deleted
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return "{}-{}".format(self.__nonce, self.__versions.get(cls, 0))
@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+"""
+Contains the JSON codec shared by FileStorage and the API
+
+dumps() and loads() use orjson or ujson when they are installed and the
+standard json module otherwise; HBNB_JSON=orjson|ujson|json picks one.
+orjson and ujson only handle 64 bit integers, the documents that may hold
+bigger ones go through the standard json module so they stay exact.
+Every backend takes datetimes, so to_dict(format_times=False) can hand
+them over as they are: orjson writes them natively (ISO 8601, without the
+fraction when the microseconds are 0), the others in the `time` format
+through default(), and parse_time() reads both back. native_datetimes
+tells whether that is faster than formatting them in to_dict().
+"""
+
+from datetime import datetime
+import json
+from os import getenv
+import re
+
+# a run of 19 digits or more, a number that may not fit in 64 bits
+long_number = re.compile(r"\d{19}")
+long_number_bytes = re.compile(rb"\d{19}")
+
+
+def default(obj):
+    """serializes the objects the JSON backends do not know about"""
+    if isinstance(obj, datetime):
+        # same as models.base_model.format_time()
+        return obj.isoformat(timespec="microseconds")
+    raise TypeError("Object of type {} is not JSON serializable"
+                    .format(type(obj).__name__))
+
+
+def _json_dumps(obj, sort_keys=False):
+    """dumps() of the standard json module"""
+    return json.dumps(obj, default=default, sort_keys=sort_keys)
+
+
+def _json_loads(data):
+    """loads() of the standard json module"""
+    return json.loads(data)
+
+
+def _exact(dumps, loads):
+    """
+    returns the (dumps, loads) pair of a 64 bit backend that hands the
+    integers it can not represent exactly over to the standard json module
+    """
+    def exact_dumps(obj, sort_keys=False):
+        """dumps(), by the json module if obj has a too big integer"""
+        try:
+            return dumps(obj, sort_keys=sort_keys)
+        except (TypeError, OverflowError):
+            # default() raises TypeError for the same objects there
+            return _json_dumps(obj, sort_keys=sort_keys)
+
+    def exact_loads(data):
+        """loads(), by the json module if data may have a too big integer"""
+        if isinstance(data, str):
+            found = long_number.search(data)
+        else:
+            found = long_number_bytes.search(data)
+        if found:
+            return _json_loads(data if isinstance(data, (str, bytes))
+                               else bytes(data))
+        return loads(data)
+    return exact_dumps, exact_loads
+
+
+def _orjson_backend():
+    """returns the (dumps, loads) pair of orjson"""
+    import orjson
+
+    def dumps(obj, sort_keys=False):
+        """dumps() of orjson"""
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        return orjson.dumps(obj, default=default, option=option).decode()
+    return _exact(dumps, orjson.loads)
+
+
+def _ujson_backend():
+    """returns the (dumps, loads) pair of ujson"""
+    import ujson
+
+    def dumps(obj, sort_keys=False):
+        """dumps() of ujson"""
+        return ujson.dumps(obj, default=default, sort_keys=sort_keys,
+                           ensure_ascii=False, escape_forward_slashes=False)
+
+    def loads(data):
+        """loads() of ujson, which does not take memoryviews"""
+        if not isinstance(data, (str, bytes)):
+            data = bytes(data)
+        return ujson.loads(data)
+    return _exact(dumps, loads)
+
+
+backends = {
+    "orjson": _orjson_backend,
+    "ujson": _ujson_backend,
+    "json": lambda: (_json_dumps, _json_loads),
+}
+
+
+def load_backend(name=None):
+    """
+    returns the (name, dumps, loads) of backend name, of the first one
+    installed when name is None or "auto", stdlib json if it is missing
+    """
+    if name in backends:
+        names = [name]
+    else:
+        names = ["orjson", "ujson"]
+    for name in names:
+        try:
+            return (name,) + backends[name]()
+        except ImportError:
+            pass
+    return ("json", _json_dumps, _json_loads)
+
+
+backend, dumps, loads = load_backend(getenv("HBNB_JSON"))
+# bool - True when the backend encodes datetimes without calling default()
+native_datetimes = backend == "orjson"
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+"""
+Contains the class ObjectCache, the LRU cache DBStorage keeps the objects
+it reads by (class name, id) in when HBNB_CACHE_SIZE is set
+"""
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+
+class ObjectCache:
+    """
+    Keeps up to size objects, dropping the least recently used one when it
+    is full, each of them for ttl seconds at most (None for no limit).
+    Safe to share between the threads of the process.
+    """
+
+    def __init__(self, size, ttl=None):
+        """Instantiate an empty cache"""
+        # int - maximum number of objects kept
+        self.size = size
+        # float - seconds an object is kept after it is stored
+        self.ttl = ttl
+        # int - lookups answered, not answered, and objects dropped to
+        # make room for new ones
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # OrderedDict - key: (expiry time or None, object), least recently
+        # used first
+        self.__entries = OrderedDict()
+        self.__lock = Lock()
+
+    def __len__(self):
+        """returns the number of objects in the cache"""
+        return len(self.__entries)
+
+    def get(self, key):
+        """returns the object stored under key, None if missing or expired"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] is not None and \
+                    entry[0] <= monotonic():
+                del self.__entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, obj):
+        """stores obj under key, evicting the least recently used if full"""
+        expires = monotonic() + self.ttl if self.ttl is not None else None
+        with self.__lock:
+            self.__entries[key] = (expires, obj)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.size:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key):
+        """removes the object stored under key, if any"""
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self):
+        """removes every object"""
+        with self.__lock:
+            self.__entries.clear()
+
+    def stats(self):
+        """returns the counters and the number of objects cached"""
+        return {"hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "size": len(self)}
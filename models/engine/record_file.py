@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""
+Contains the functions that write and map the offset-indexed record file
+used by FileStorage when HBNB_FILE_FORMAT=records
+
+The file holds one JSON record per line, followed by a JSON index line
+{"<class name>.id": [offset, length], ...} and a last line with the
+offset of the index line. Readers mmap the file and only decode the
+records they are asked for, so processes on the same host share the
+page cache instead of each one holding its own copy of every object.
+"""
+
+import mmap
+from models.engine.json_codec import dumps, loads
+from os import replace
+
+
+def write_records(path, items):
+    """writes the (<class name>.id, JSON text) pairs of items to path"""
+    index = {}
+    offset = 0
+    with open(path + ".tmp", 'wb') as f:
+        for key, text in items:
+            data = text.encode("utf-8")
+            index[key] = [offset, len(data)]
+            f.write(data + b"\n")
+            offset += len(data) + 1
+        f.write(dumps(index).encode("utf-8") + b"\n")
+        f.write(str(offset).encode("utf-8") + b"\n")
+    # readers that mapped the old file keep it until they reload
+    replace(path + ".tmp", path)
+
+
+def read_records(path):
+    """
+    maps the record file at path, returns the map and its index:
+    (mmap, {<class name>.id: [offset, length]})
+    """
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    end = len(mm) - 1
+    start = mm.rfind(b"\n", 0, end) + 1
+    index_at = int(mm[start:end])
+    return mm, loads(mm[index_at:start])
+
+
+def read_record(record):
+    """decodes the (mmap, offset, length) record returned by the index"""
+    mm, offset, length = record
+    return loads(mm[offset:offset + length])
+
+
+def record_text(record):
+    """returns the JSON text of the (mmap, offset, length) record"""
+    mm, offset, length = record
+    return mm[offset:offset + length].decode("utf-8")
@@ -0,0 +1,190 @@
+#!/usr/bin/python3
+"""
+Contains the TestBatchDocs and TestBatch classes
+"""
+
+from api.v1.app import app
+from api.v1.views import batch
+import models
+from models import storage
+from models.city import City
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestBatchDocs(unittest.TestCase):
+    """Tests to check the documentation and style of batch.py"""
+
+    def test_pep8_conformance_batch(self):
+        """Test that api/v1/views/batch.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/batch.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_batch(self):
+        """Test that tests/test_api/test_v1/test_views/test_batch.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(
+            ['tests/test_api/test_v1/test_views/test_batch.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_batch_module_docstring(self):
+        """Test for the batch.py module docstring"""
+        self.assertIsNot(batch.__doc__, None,
+                         "batch.py needs a docstring")
+        self.assertTrue(len(batch.__doc__) >= 1,
+                        "batch.py needs a docstring")
+
+
+class TestBatch(unittest.TestCase):
+    """Test POST /api/v1/cities:batch"""
+
+    def setUp(self):
+        """Create a state for the cities"""
+        self.client = app.test_client()
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        # the id, the object is expired when a batch is rolled back
+        self.state_id = state.id
+
+    def tearDown(self):
+        """Delete the state and its cities"""
+        storage.close()
+        for city in storage.all(City).values():
+            if city.state_id == self.state_id:
+                storage.delete(city)
+        storage.delete(storage.get(State, self.state_id))
+        storage.save()
+
+    def post(self, ops):
+        """POST ops to /cities:batch, returns the status and the results"""
+        response = self.client.post("/api/v1/cities:batch", json=ops)
+        return response.status_code, response.get_json()
+
+    def test_create_update_delete(self):
+        """Test a batch of every operation, with its statuses in order"""
+        status, results = self.post([
+            {"op": "create", "data": {"state_id": self.state_id,
+                                      "name": "Fresno"}},
+            {"op": "create", "data": {"state_id": self.state_id}},
+            {"op": "create", "data": {"state_id": "nope", "name": "X"}}])
+        self.assertEqual(status, 200)
+        self.assertEqual([result["status"] for result in results],
+                         [201, 400, 404])
+        id = results[0]["id"]
+        storage.close()
+        self.assertEqual(storage.get(City, id).name, "Fresno")
+        status, results = self.post([
+            {"op": "update", "id": id, "data": {"name": "Napa"}},
+            {"op": "delete", "id": "nope"}])
+        self.assertEqual([result["status"] for result in results],
+                         [200, 404])
+        storage.close()
+        self.assertEqual(storage.get(City, id).name, "Napa")
+        status, results = self.post([{"op": "delete", "id": id},
+                                     {"op": "delete", "id": id}])
+        self.assertEqual([result["status"] for result in results],
+                         [200, 404])
+        storage.close()
+        self.assertIsNone(storage.get(City, id))
+
+    def test_invalid_operations(self):
+        """Test that ids and foreign keys that are not strings get a 400"""
+        status, results = self.post([
+            {"op": "create", "data": {"state_id": ["x"], "name": "X"}},
+            {"op": "update", "id": ["x"], "data": {"name": "X"}},
+            {"op": "delete", "id": {"x": 1}},
+            {"op": "delete"},
+            {"op": "rename", "id": "x"},
+            "create"])
+        self.assertEqual(status, 200)
+        self.assertEqual([result["status"] for result in results],
+                         [400] * 6)
+        self.assertEqual(self.post({"op": "create"})[0], 400)
+
+    def test_create_with_id(self):
+        """Test that a create can not take the id of another object"""
+        city = City(state_id=self.state_id, name="Fresno")
+        storage.new(city)
+        storage.save()
+        status, results = self.post([
+            {"op": "create", "data": {"id": city.id, "name": "X",
+                                      "state_id": self.state_id}},
+            {"op": "create", "data": {"id": "new-id", "name": "Y",
+                                      "state_id": self.state_id}},
+            {"op": "create", "data": {"id": "new-id", "name": "Z",
+                                      "state_id": self.state_id}},
+            {"op": "create", "data": {"id": 5, "name": "Z",
+                                      "state_id": self.state_id}}])
+        self.assertEqual([result["status"] for result in results],
+                         [409, 201, 409, 400])
+        storage.close()
+        self.assertEqual(storage.get(City, city.id).name, "Fresno")
+        self.assertEqual(storage.get(City, "new-id").name, "Y")
+
+    def test_update_class_ignored(self):
+        """Test that an update ignores the __class__ of to_dict()"""
+        city = City(state_id=self.state_id, name="Fresno")
+        storage.new(city)
+        storage.save()
+        status, results = self.post([
+            {"op": "update", "id": city.id,
+             "data": {"__class__": "State", "name": "Napa"}}])
+        self.assertEqual(results[0]["status"], 200)
+        storage.close()
+        self.assertEqual(type(storage.get(City, city.id)), City)
+        self.assertEqual(storage.get(City, city.id).name, "Napa")
+
+    def test_save_fails(self):
+        """Test that nothing is reported as done when save() fails"""
+        ops = [{"op": "create", "data": {"state_id": self.state_id,
+                                         "name": "Fresno"}},
+               {"op": "create", "data": {"name": "X"}}]
+        with mock.patch.object(storage, "save", side_effect=OSError):
+            status, results = self.post(ops)
+        self.assertEqual(status, 409)
+        self.assertEqual([result["status"] for result in results],
+                         [409, 400])
+
+    def test_save_fails_rolled_back(self):
+        """Test that none of the changes of a batch that was not saved are
+        saved by the next save()"""
+        kept = City(state_id=self.state_id, name="Fresno")
+        gone = City(state_id=self.state_id, name="Napa")
+        storage.new(kept)
+        storage.new(gone)
+        storage.save()
+        ops = [{"op": "create", "data": {"state_id": self.state_id,
+                                         "name": "ghost"}},
+               {"op": "update", "id": kept.id, "data": {"name": "X"}},
+               {"op": "delete", "id": gone.id}]
+        with mock.patch.object(storage, "save", side_effect=OSError):
+            status, results = self.post(ops)
+        self.assertEqual(status, 409)
+        storage.save()
+        storage.close()
+        storage.reload()
+        names = sorted(city.name for city in storage.all(City).values()
+                       if city.state_id == self.state_id)
+        self.assertEqual(names, ["Fresno", "Napa"])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_rejected_batch_rolled_back(self):
+        """Test that a batch the database rejects is rolled back"""
+        status, results = self.post([
+            {"op": "create", "data": {"id": "rolled-back", "name": "X",
+                                      "state_id": self.state_id}},
+            # cities.name is NOT NULL
+            {"op": "create", "data": {"state_id": self.state_id,
+                                      "name": None}}])
+        self.assertEqual(status, 409)
+        self.assertEqual([result["status"] for result in results],
+                         [409, 409])
+        storage.close()
+        self.assertIsNone(storage.get(City, "rolled-back"))
@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+"""
+Contains the TestConditionalDocs and TestConditional classes
+"""
+
+from api.v1.app import app
+from api.v1.views import conditional
+from datetime import datetime, timedelta
+import models
+from models import storage
+from models.state import State
+import pep8
+from sqlalchemy.dialects import mysql
+import unittest
+
+
+class TestConditionalDocs(unittest.TestCase):
+    """Tests to check the documentation and style of conditional.py"""
+
+    def test_pep8_conformance_conditional(self):
+        """Test that api/v1/views/conditional.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/conditional.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_conditional(self):
+        """Test that tests/test_api/test_v1/test_views/test_conditional.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(
+            ['tests/test_api/test_v1/test_views/test_conditional.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_conditional_module_docstring(self):
+        """Test for the conditional.py module docstring"""
+        self.assertIsNot(conditional.__doc__, None,
+                         "conditional.py needs a docstring")
+        self.assertTrue(len(conditional.__doc__) >= 1,
+                        "conditional.py needs a docstring")
+
+
+class TestConditional(unittest.TestCase):
+    """Test the ETags and the 304 answers of the views"""
+
+    def setUp(self):
+        """Create a state"""
+        self.client = app.test_client()
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        self.state_id = state.id
+        self.url = "/api/v1/states/" + state.id
+
+    def tearDown(self):
+        """Delete the state"""
+        storage.close()
+        storage.delete(storage.get(State, self.state_id))
+        storage.save()
+
+    def set_updated_at(self, updated_at):
+        """saves updated_at as the updated_at of the state"""
+        storage.close()
+        state = storage.get(State, self.state_id)
+        state.updated_at = updated_at
+        storage.new(state)
+        storage.save()
+        storage.close()
+
+    def test_object_etag(self):
+        """Test that an object answers 304 to its own ETag only"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag, weak = response.get_etag()
+        self.assertFalse(weak)
+        self.assertIsNotNone(response.last_modified)
+        response = self.client.get(self.url,
+                                   headers={"If-None-Match": '"' + etag + '"'})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.get_etag(), (etag, False))
+        response = self.client.get(self.url,
+                                   headers={"If-None-Match": '"other"'})
+        self.assertEqual(response.status_code, 200)
+        self.client.put(self.url, json={"name": "Nevada"})
+        response = self.client.get(self.url,
+                                   headers={"If-None-Match": '"' + etag + '"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["name"], "Nevada")
+        self.assertNotEqual(response.get_etag()[0], etag)
+
+    def test_same_second_writes(self):
+        """Test that two writes in the same second get different ETags"""
+        second = datetime(2020, 1, 1, 12, 0, 0)
+        self.set_updated_at(second + timedelta(microseconds=1))
+        etag = self.client.get(self.url).get_etag()[0]
+        self.set_updated_at(second + timedelta(microseconds=2))
+        response = self.client.get(self.url,
+                                   headers={"If-None-Match": '"' + etag + '"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since(self):
+        """Test that If-Modified-Since is used without If-None-Match"""
+        self.set_updated_at(datetime(2020, 1, 1, 12, 0, 0, 500))
+        since = {"If-Modified-Since": "Wed, 01 Jan 2020 12:00:00 GMT"}
+        before = {"If-Modified-Since": "Wed, 01 Jan 2020 11:59:59 GMT"}
+        self.assertEqual(self.client.get(self.url, headers=since).status_code,
+                         304)
+        self.assertEqual(self.client.get(self.url, headers=before).status_code,
+                         200)
+        headers = dict(since, **{"If-None-Match": '"other"'})
+        self.assertEqual(self.client.get(self.url,
+                                         headers=headers).status_code, 200)
+
+    def test_list_etag(self):
+        """Test that a list answers 304 until an object of its class
+        changes, and that its ETag is weak and depends on the query"""
+        url = "/api/v1/states"
+        response = self.client.get(url)
+        etag, weak = response.get_etag()
+        self.assertTrue(weak)
+        headers = {"If-None-Match": 'W/"' + etag + '"'}
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(self.client.get(url + "?limit=1",
+                                         headers=headers).status_code, 200)
+        self.client.put(self.url, json={"name": "Nevada"})
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.get_etag()[0], etag)
+
+    def test_nested_list_etag(self):
+        """Test that a list of children changes with its parent class"""
+        url = self.url + "/cities"
+        etag = self.client.get(url).get_etag()[0]
+        headers = {"If-None-Match": 'W/"' + etag + '"'}
+        self.assertEqual(self.client.get(url, headers=headers).status_code,
+                         304)
+        self.client.put(self.url, json={"name": "Nevada"})
+        self.assertEqual(self.client.get(url, headers=headers).status_code,
+                         200)
+
+    def test_not_found_no_etag(self):
+        """Test that a 404 carries no ETag"""
+        response = self.client.get("/api/v1/states/nope")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_etag(), (None, None))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_mysql_microseconds(self):
+        """Test that MySQL keeps the microseconds of the datetimes"""
+        for name in ("created_at", "updated_at"):
+            column = State.__table__.c[name]
+            self.assertEqual(str(column.type.compile(
+                dialect=mysql.dialect())), "DATETIME(6)")
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+"""
+Contains the TestIndex class
+"""
+
+from api.v1.app import app
+from api.v1.views import index
+from models import storage
+from models.state import State
+import unittest
+from unittest import mock
+
+
+class TestIndex(unittest.TestCase):
+    """Test /api/v1/status and the cached /api/v1/stats"""
+
+    def setUp(self):
+        """Start without a cached /stats"""
+        self.client = app.test_client()
+        index.stats_cache["stats"] = None
+        self.ids = []
+
+    def tearDown(self):
+        """Delete the states created by the tests"""
+        storage.close()
+        for id in self.ids:
+            storage.delete(storage.get(State, id))
+        storage.save()
+        index.stats_cache["stats"] = None
+
+    def add_state(self):
+        """saves a state without going through the API"""
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        self.ids.append(state.id)
+
+    def test_status(self):
+        """Test /status"""
+        response = self.client.get("/api/v1/status")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {"status": "OK"})
+
+    def test_stats(self):
+        """Test that /stats counts every class"""
+        self.add_state()
+        stats = self.client.get("/api/v1/stats").get_json()
+        self.assertEqual(stats["states"], storage.count(State))
+        self.assertEqual(set(stats), {"amenities", "cities", "places",
+                                      "reviews", "states", "users"})
+        self.assertEqual(sum(stats.values()), storage.count())
+
+    def test_stats_cached(self):
+        """Test that /stats is counted once while it is cached"""
+        count_all = mock.patch.object(storage, "count_all",
+                                      wraps=storage.count_all)
+        with count_all as counted:
+            first = self.client.get("/api/v1/stats").get_json()
+            self.add_state()
+            self.assertEqual(self.client.get("/api/v1/stats").get_json(),
+                             first)
+            self.assertEqual(counted.call_count, 1)
+
+    def test_stats_invalidated(self):
+        """Test that POST, PUT and DELETE requests drop the cached /stats"""
+        states = self.client.get("/api/v1/stats").get_json()["states"]
+        response = self.client.post("/api/v1/states",
+                                    json={"name": "Nevada"})
+        self.ids.append(response.get_json()["id"])
+        self.assertEqual(
+            self.client.get("/api/v1/stats").get_json()["states"],
+            states + 1)
+        self.client.delete("/api/v1/states/" + self.ids.pop())
+        self.assertEqual(
+            self.client.get("/api/v1/stats").get_json()["states"], states)
+        # a failed request drops it too, it costs a count at most
+        self.client.put("/api/v1/states/nope", json={})
+        self.assertIsNone(index.stats_cache["stats"])
+
+    def test_stats_expire(self):
+        """Test that /stats is counted again after HBNB_API_STATS_TTL"""
+        states = self.client.get("/api/v1/stats").get_json()["states"]
+        self.add_state()
+        with mock.patch.object(index, "monotonic",
+                               return_value=index.stats_cache["expires"] + 1):
+            self.assertEqual(
+                self.client.get("/api/v1/stats").get_json()["states"],
+                states + 1)
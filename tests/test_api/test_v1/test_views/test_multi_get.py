@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""
+Contains the TestMultiGetDocs and TestMultiGet classes
+"""
+
+from api.v1.app import app
+from api.v1.views import multi_get
+from models import storage
+from models.city import City
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestMultiGetDocs(unittest.TestCase):
+    """Tests to check the documentation and style of multi_get.py"""
+
+    def test_pep8_conformance_multi_get(self):
+        """Test that api/v1/views/multi_get.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/multi_get.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_multi_get(self):
+        """Test that tests/test_api/test_v1/test_views/test_multi_get.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(
+            ['tests/test_api/test_v1/test_views/test_multi_get.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_multi_get_module_docstring(self):
+        """Test for the multi_get.py module docstring"""
+        self.assertIsNot(multi_get.__doc__, None,
+                         "multi_get.py needs a docstring")
+        self.assertTrue(len(multi_get.__doc__) >= 1,
+                        "multi_get.py needs a docstring")
+
+
+class TestMultiGet(unittest.TestCase):
+    """Test ?ids=a,b,c on the list views"""
+
+    def setUp(self):
+        """Create a state with 3 cities"""
+        self.client = app.test_client()
+        state = State(name="California")
+        storage.new(state)
+        cities = [City(state_id=state.id, name="c{}".format(i))
+                  for i in range(3)]
+        for city in cities:
+            storage.new(city)
+        storage.save()
+        self.state_id = state.id
+        self.city_ids = [city.id for city in cities]
+
+    def tearDown(self):
+        """Delete the state and its cities"""
+        storage.close()
+        for id in self.city_ids:
+            storage.delete(storage.get(City, id))
+        storage.delete(storage.get(State, self.state_id))
+        storage.save()
+
+    def get_ids(self, url):
+        """GETs url, returns the status and the ids answered"""
+        response = self.client.get(url)
+        if response.status_code != 200:
+            return response.status_code, response.get_json()
+        return 200, [obj["id"] for obj in response.get_json()]
+
+    def test_order_and_missing(self):
+        """Test that the objects come in the order asked, without the
+        missing or repeated ids"""
+        c0, c1, c2 = self.city_ids
+        ids = ",".join([c2, "nope", c0, c2, ""])
+        self.assertEqual(self.get_ids("/api/v1/cities?ids=" + ids),
+                         (200, [c2, c0]))
+        self.assertEqual(self.get_ids("/api/v1/cities?ids=nope"), (200, []))
+
+    def test_every_list(self):
+        """Test ?ids on the lists of every object"""
+        ids = "{},{}".format(self.state_id, "nope")
+        self.assertEqual(self.get_ids("/api/v1/states?ids=" + ids),
+                         (200, [self.state_id]))
+        # ?ids comes before ?limit
+        self.assertEqual(self.get_ids("/api/v1/states?limit=5&ids=" + ids),
+                         (200, [self.state_id]))
+        # other classes are not found
+        self.assertEqual(self.get_ids("/api/v1/amenities?ids=" + ids),
+                         (200, []))
+
+    def test_invalid(self):
+        """Test the 400 answers to missing and too many ids"""
+        for url in ("/api/v1/cities", "/api/v1/cities?ids=",
+                    "/api/v1/cities?ids=,,", "/api/v1/states?ids="):
+            self.assertEqual(self.get_ids(url),
+                             (400, {"error": "Missing ids"}))
+        with mock.patch.object(multi_get, "max_limit", 2):
+            self.assertEqual(self.get_ids("/api/v1/cities?ids=" +
+                                          ",".join(self.city_ids)),
+                             (400, {"error": "Too many ids"}))
+            # the repeated ids are not counted
+            self.assertEqual(self.get_ids("/api/v1/cities?ids={0},{0},{0}".
+                                          format(self.city_ids[0])),
+                             (200, self.city_ids[:1]))
@@ -0,0 +1,173 @@
+#!/usr/bin/python3
+"""
+Contains the TestPaginationDocs and TestPagination classes
+"""
+
+from api.v1.app import app
+from api.v1.views import pagination
+from base64 import urlsafe_b64encode
+from datetime import datetime, timedelta
+import json
+from models import storage
+from models.city import City
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+
+
+def make_cursor(created_at, id):
+    """returns a cursor made of created_at (a string) and id"""
+    data = json.dumps([created_at, id]).encode("utf-8")
+    return urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+class TestPaginationDocs(unittest.TestCase):
+    """Tests to check the documentation and style of pagination.py"""
+
+    def test_pep8_conformance_pagination(self):
+        """Test that api/v1/views/pagination.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/pagination.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_pagination(self):
+        """Test that tests/test_api/test_v1/test_views/test_pagination.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(
+            ['tests/test_api/test_v1/test_views/test_pagination.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pagination_module_docstring(self):
+        """Test for the pagination.py module docstring"""
+        self.assertIsNot(pagination.__doc__, None,
+                         "pagination.py needs a docstring")
+        self.assertTrue(len(pagination.__doc__) >= 1,
+                        "pagination.py needs a docstring")
+
+
+class TestPagination(unittest.TestCase):
+    """Test ?limit and ?cursor on the list views"""
+
+    def setUp(self):
+        """Create a state with 5 cities, one second apart"""
+        self.client = app.test_client()
+        state = State(name="California")
+        storage.new(state)
+        start = datetime(2020, 1, 1)
+        cities = [City(state_id=state.id, name="c{}".format(i),
+                       created_at=(start + timedelta(seconds=i)).isoformat())
+                  for i in range(5)]
+        for city in cities:
+            storage.new(city)
+        storage.save()
+        self.state_id = state.id
+        self.names = [city.name for city in cities]
+        self.url = "/api/v1/states/{}/cities".format(state.id)
+
+    def tearDown(self):
+        """Delete the state and its cities"""
+        storage.close()
+        for city in storage.all(City).values():
+            if city.state_id == self.state_id:
+                storage.delete(city)
+        storage.delete(storage.get(State, self.state_id))
+        storage.save()
+
+    def walk(self, url):
+        """follows the X-Next-Cursor of url, returns the names and pages"""
+        names = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            names += [city["name"] for city in response.get_json()]
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            url = cursor and "{}?limit=2&cursor={}".format(self.url, cursor)
+        return names, pages
+
+    def test_limit(self):
+        """Test that ?limit answers the first objects and links the next"""
+        response = self.client.get(self.url + "?limit=2")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([city["name"] for city in response.get_json()],
+                         self.names[:2])
+        cursor = response.headers["X-Next-Cursor"]
+        link = response.headers["Link"]
+        self.assertTrue(link.startswith("<http://localhost" + self.url))
+        self.assertTrue(link.endswith('>; rel="next"'))
+        self.assertIn("cursor=" + cursor, link)
+        self.assertIn("limit=2", link)
+
+    def test_cursor_walks_every_page(self):
+        """Test that following the cursors gives every object once"""
+        self.assertEqual(self.walk(self.url + "?limit=2"), (self.names, 3))
+        response = self.client.get(self.url + "?limit=5")
+        self.assertNotIn("Link", response.headers)
+        self.assertNotIn("X-Next-Cursor", response.headers)
+
+    def test_cursor_stable(self):
+        """Test that objects added or deleted between pages do not make the
+        next pages skip or repeat objects"""
+        response = self.client.get(self.url + "?limit=2")
+        cursor = response.headers["X-Next-Cursor"]
+        first = storage.get(City, response.get_json()[0]["id"])
+        storage.delete(first)
+        storage.new(City(state_id=self.state_id, name="new"))
+        storage.save()
+        names, pages = self.walk("{}?limit=2&cursor={}".format(self.url,
+                                                               cursor))
+        self.assertEqual(names, self.names[2:] + ["new"])
+
+    def test_cursor_without_limit(self):
+        """Test that ?cursor alone gets pages of HBNB_API_MAX_LIMIT"""
+        cursor = self.client.get(self.url + "?limit=1").headers[
+            "X-Next-Cursor"]
+        with mock.patch.object(pagination, "max_limit", 2):
+            response = self.client.get(self.url + "?cursor=" + cursor)
+        self.assertEqual([city["name"] for city in response.get_json()],
+                         self.names[1:3])
+        self.assertIn("X-Next-Cursor", response.headers)
+
+    def test_limit_capped(self):
+        """Test that ?limit is capped to HBNB_API_MAX_LIMIT"""
+        with mock.patch.object(pagination, "max_limit", 3):
+            response = self.client.get(self.url + "?limit=100")
+        self.assertEqual(len(response.get_json()), 3)
+        self.assertIn("limit=3", response.headers["Link"])
+
+    def test_top_level_list(self):
+        """Test that the lists of every object page as well"""
+        response = self.client.get("/api/v1/states?limit=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), 1)
+        if storage.count(State) > 1:
+            self.assertIn("/api/v1/states?", response.headers["Link"])
+
+    def test_invalid(self):
+        """Test that invalid limits and cursors get a 400"""
+        cursors = ["zz", make_cursor("nope", "x"),
+                   make_cursor("2020-01-01T00:00:00+00:00", "x"),
+                   make_cursor("2020-01-01T00:00:00", 5),
+                   make_cursor("2020-01-01T00:00:00", None),
+                   urlsafe_b64encode(b'"text"').decode("ascii")]
+        urls = [self.url + "?limit=" + limit
+                for limit in ("0", "-1", "abc", "")]
+        urls += [self.url + "?limit=2&cursor=" + cursor
+                 for cursor in cursors]
+        urls += ["/api/v1/states?cursor=" + cursor for cursor in cursors]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json(),
+                                 {"error": "Invalid limit or cursor"})
+
+    def test_not_found(self):
+        """Test that the page of an unknown parent is a 404"""
+        response = self.client.get("/api/v1/states/nope/cities?limit=2")
+        self.assertEqual(response.status_code, 404)
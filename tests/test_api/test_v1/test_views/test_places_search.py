@@ -0,0 +1,155 @@
+#!/usr/bin/python3
+"""
+Contains the TestPlacesSearch class
+"""
+
+from api.v1.app import app
+from datetime import datetime, timedelta
+import models
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import unittest
+
+
+class TestPlacesSearch(unittest.TestCase):
+    """Test POST /api/v1/places_search"""
+
+    def setUp(self):
+        """
+        Create two states: s1 with the cities c1 (place p1) and c2 (p2),
+        s2 with c3 (p3 and p4). wifi is in p1, p3 and p4, pool in p1 and p4
+        """
+        self.client = app.test_client()
+        self.objs = []
+        user = self.add(User(email="a@b.c", password="pwd"))
+        self.ids = {}
+        for name in ("s1", "s2"):
+            self.ids[name] = self.add(State(name=name)).id
+        for name, state in (("c1", "s1"), ("c2", "s1"), ("c3", "s2")):
+            self.ids[name] = self.add(City(name=name,
+                                           state_id=self.ids[state])).id
+        for name in ("wifi", "pool"):
+            self.ids[name] = self.add(Amenity(name=name)).id
+        start = datetime(2020, 1, 1)
+        places = (("p1", "c1", ["wifi", "pool"]), ("p2", "c2", []),
+                  ("p3", "c3", ["wifi"]), ("p4", "c3", ["wifi", "pool"]))
+        for i, (name, city, amenities) in enumerate(places):
+            place = Place(name=name, city_id=self.ids[city], user_id=user.id,
+                          created_at=(start + timedelta(seconds=i)).
+                          isoformat())
+            if models.storage_t == "db":
+                place.amenities = [storage.get(Amenity, self.ids[amenity])
+                                   for amenity in amenities]
+            else:
+                place.amenity_ids = [self.ids[amenity]
+                                     for amenity in amenities]
+            self.ids[name] = self.add(place).id
+        storage.save()
+
+    def add(self, obj):
+        """adds obj to storage, to be deleted by tearDown"""
+        storage.new(obj)
+        self.objs.append((type(obj), obj.id))
+        if models.storage_t == "db":
+            # the foreign keys of the next objects need it in the database
+            storage.save()
+        return obj
+
+    def tearDown(self):
+        """Delete the objects of setUp, children first"""
+        storage.close()
+        for cls, id in reversed(self.objs):
+            storage.delete(storage.get(cls, id))
+        storage.save()
+
+    def search(self, body, query=""):
+        """POSTs body, returns the status and the names found (sorted)"""
+        response = self.client.post("/api/v1/places_search" + query,
+                                    json=body)
+        if response.status_code != 200:
+            return response.status_code, response.get_json()
+        return 200, sorted(place["name"] for place in response.get_json())
+
+    def test_states_and_cities(self):
+        """Test the places of states, of cities and of both"""
+        ids = self.ids
+        self.assertEqual(self.search({"states": [ids["s1"]]}),
+                         (200, ["p1", "p2"]))
+        self.assertEqual(self.search({"cities": [ids["c3"]]}),
+                         (200, ["p3", "p4"]))
+        self.assertEqual(self.search({"states": [ids["s1"]],
+                                      "cities": [ids["c3"]]}),
+                         (200, ["p1", "p2", "p3", "p4"]))
+        # a city of a state listed is not searched twice
+        self.assertEqual(self.search({"states": [ids["s1"]],
+                                      "cities": [ids["c1"]]}),
+                         (200, ["p1", "p2"]))
+        self.assertEqual(self.search({"states": ["nope"]}), (200, []))
+
+    def test_amenities(self):
+        """Test that places must have every amenity listed"""
+        ids = self.ids
+        both = [ids["s1"], ids["s2"]]
+        self.assertEqual(self.search({"states": both,
+                                      "amenities": [ids["wifi"]]}),
+                         (200, ["p1", "p3", "p4"]))
+        self.assertEqual(self.search({"states": both,
+                                      "amenities": [ids["wifi"],
+                                                    ids["pool"]]}),
+                         (200, ["p1", "p4"]))
+        self.assertEqual(self.search({"cities": [ids["c3"]],
+                                      "amenities": [ids["pool"]]}),
+                         (200, ["p4"]))
+        self.assertEqual(self.search({"states": both,
+                                      "amenities": [ids["pool"], "nope"]}),
+                         (200, []))
+        names = self.search({"amenities": [ids["wifi"], ids["pool"]]})[1]
+        self.assertEqual(names, ["p1", "p4"])
+
+    def test_empty_body(self):
+        """Test that an empty body, or empty lists, return every place"""
+        count = storage.count(Place)
+        for body in ({}, {"states": [], "cities": [], "amenities": []}):
+            status, names = self.search(body)
+            self.assertEqual(status, 200)
+            self.assertEqual(len(names), count)
+
+    def test_invalid_body(self):
+        """Test the 400 answers to invalid bodies"""
+        response = self.client.post("/api/v1/places_search", data="x",
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(), {"error": "Not a JSON"})
+        self.assertEqual(self.search([]), (400, {"error": "Not a JSON"}))
+        self.assertEqual(self.search({"states": self.ids["s1"]}),
+                         (400, {"error": "Not a list"}))
+        self.assertEqual(self.search({"amenities": {"a": 1}}),
+                         (400, {"error": "Not a list"}))
+        # ids that are not strings are left out
+        self.assertEqual(self.search({"states": [self.ids["s1"], 5, None]}),
+                         (200, ["p1", "p2"]))
+        for query in ("?limit=0", "?limit=x", "?cursor=zz"):
+            self.assertEqual(self.search({}, query)[0], 400)
+
+    def test_pages(self):
+        """Test that the results come in (created_at, id) order pages
+        linked by Link and X-Next-Cursor"""
+        body = {"states": [self.ids["s1"], self.ids["s2"]]}
+        url = "/api/v1/places_search?limit=3"
+        response = self.client.post(url, json=body)
+        self.assertEqual([place["name"] for place in response.get_json()],
+                         ["p1", "p2", "p3"])
+        cursor = response.headers["X-Next-Cursor"]
+        link = response.headers["Link"]
+        self.assertIn("/api/v1/places_search?", link)
+        self.assertIn("cursor=" + cursor, link)
+        self.assertTrue(link.endswith('>; rel="next"'))
+        response = self.client.post(url + "&cursor=" + cursor, json=body)
+        self.assertEqual([place["name"] for place in response.get_json()],
+                         ["p4"])
+        self.assertNotIn("Link", response.headers)
+        self.assertNotIn("X-Next-Cursor", response.headers)
@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""
+Contains the TestStreamingDocs and TestStreaming classes
+"""
+
+from api.v1.app import app
+from api.v1.views import streaming
+import json
+from models import storage
+from models.city import City
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestStreamingDocs(unittest.TestCase):
+    """Tests to check the documentation and style of streaming.py"""
+
+    def test_pep8_conformance_streaming(self):
+        """Test that api/v1/views/streaming.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/streaming.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_streaming(self):
+        """Test that tests/test_api/test_v1/test_views/test_streaming.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(
+            ['tests/test_api/test_v1/test_views/test_streaming.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_streaming_module_docstring(self):
+        """Test for the streaming.py module docstring"""
+        self.assertIsNot(streaming.__doc__, None,
+                         "streaming.py needs a docstring")
+        self.assertTrue(len(streaming.__doc__) >= 1,
+                        "streaming.py needs a docstring")
+
+
+class TestStreaming(unittest.TestCase):
+    """Test ?stream=1 on the list views"""
+
+    def setUp(self):
+        """Create a state with 5 cities"""
+        self.client = app.test_client()
+        state = State(name="California")
+        storage.new(state)
+        for i in range(5):
+            storage.new(City(state_id=state.id, name="c{}".format(i)))
+        storage.save()
+        self.state_id = state.id
+        self.url = "/api/v1/states/{}/cities".format(state.id)
+
+    def tearDown(self):
+        """Delete the state and its cities"""
+        storage.close()
+        for city in storage.all(City).values():
+            if city.state_id == self.state_id:
+                storage.delete(city)
+        storage.delete(storage.get(State, self.state_id))
+        storage.save()
+
+    def by_id(self, objs):
+        """returns objs sorted by id"""
+        return sorted(objs, key=lambda obj: obj["id"])
+
+    def test_same_list(self):
+        """Test that the streamed list is the list sent without ?stream"""
+        expected = self.by_id(self.client.get(self.url).get_json())
+        for value in ("1", "true", "yes"):
+            response = self.client.get(self.url + "?stream=" + value)
+            self.assertEqual(response.status_code, 200)
+            # chunked, the length is not known up front
+            self.assertNotIn("Content-Length", response.headers)
+            self.assertEqual(response.mimetype, "application/json")
+            self.assertEqual(self.by_id(json.loads(response.data)), expected)
+
+    def test_chunks(self):
+        """Test that the array is sent chunk_size objects at a time"""
+        with mock.patch.object(streaming, "chunk_size", 2):
+            response = self.client.get(self.url + "?stream=1",
+                                       buffered=False)
+            chunks = [chunk.decode("utf-8") for chunk in response.response]
+        self.assertEqual(chunks[0], "[")
+        self.assertEqual(chunks[-1], "]\n")
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual([len(json.loads("[" + chunk.lstrip(",") + "]"))
+                          for chunk in chunks[1:-1]], [2, 2, 1])
+
+    def test_empty(self):
+        """Test that an empty list streams as an empty array"""
+        state = State(name="Empty")
+        storage.new(state)
+        storage.save()
+        response = self.client.get(
+            "/api/v1/states/{}/cities?stream=1".format(state.id))
+        self.assertEqual(response.data, b"[]\n")
+        storage.delete(state)
+        storage.save()
+
+    def test_not_streamed(self):
+        """Test that other values of ?stream, or ?limit, are not streamed"""
+        for query in ("?stream=0", "?stream=", "?stream=1&limit=2"):
+            response = self.client.get(self.url + query)
+            self.assertIn("Content-Length", response.headers)
+        self.assertEqual(len(response.get_json()), 2)
+
+    def test_top_level_list(self):
+        """Test that the lists of every object stream as well"""
+        response = self.client.get("/api/v1/states?stream=1")
+        self.assertNotIn("Content-Length", response.headers)
+        self.assertEqual(len(json.loads(response.data)),
+                         storage.count(State))
@@ -7,8 +7,9 @@ from datetime import datetime
 import inspect
 import models
 from models.engine import db_storage
+from models.engine.object_cache import ObjectCache
 from models.amenity import Amenity
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Base
 from models.city import City
 from models.place import Place
 from models.review import Review
@@ -17,13 +18,43 @@ from models.user import User
 import json
 import os
 import pep8
+import shutil
+from sqlalchemy import event, select
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.orm import Query
+import tempfile
+from threading import Thread
+import time
 import unittest
+from unittest import mock
 from models import storage
 DBStorage = db_storage.DBStorage
 classes = {"Amenity": Amenity, "City": City, "Place": Place,
            "Review": Review, "State": State, "User": User}
 
 
+class QueryCounter:
+    """Counts the SQL statements sent by the storage inside a with block"""
+
+    def __init__(self):
+        """Set up the counter on the engine of models.storage"""
+        self.engine = models.storage._DBStorage__engine
+        self.count = 0
+
+    def __enter__(self):
+        """Start counting"""
+        event.listen(self.engine, "before_cursor_execute", self.executed)
+        return self
+
+    def __exit__(self, *args):
+        """Stop counting"""
+        event.remove(self.engine, "before_cursor_execute", self.executed)
+
+    def executed(self, *args):
+        """Called by SQLAlchemy before each statement"""
+        self.count += 1
+
+
 class TestDBStorageDocs(unittest.TestCase):
     """Tests to check the documentation and style of DBStorage class"""
     @classmethod
@@ -107,6 +138,97 @@ class TestDBStorage(unittest.TestCase):
         self.assertEqual(models.storage.count("State"), count + 1)
         self.assertEqual(models.storage.count(), count + 2)
 
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_count_all(self):
+        """Test that count_all returns the count of every class at once"""
+        State(name="Counted").save()
+        counts = models.storage.count_all()
+        self.assertEqual(set(counts), set(classes))
+        for name, cls in classes.items():
+            self.assertEqual(counts[name], models.storage.count(cls))
+        self.assertEqual(sum(counts.values()), models.storage.count())
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_iter_all(self):
+        """Test that iter_all yields the objects all() returns"""
+        State(name="Iterated").save()
+        self.assertEqual(set(models.storage.iter_all(State)),
+                         set(models.storage.all(State).values()))
+        self.assertEqual(len(list(models.storage.iter_all())),
+                         models.storage.count())
+        self.assertEqual(list(models.storage.iter_all("hola")), [])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_all_without_yield_per(self):
+        """Test that all() and iter_all() with load do not stream the rows,
+        the SELECT ... IN of load can not run while a stream is open"""
+        State(name="Loaded").save()
+        with mock.patch.object(Query, "yield_per",
+                               side_effect=AssertionError("yield_per")):
+            states = list(models.storage.iter_all(State, load=("cities",)))
+            self.assertIn("cities", states[0].__dict__)
+            self.assertEqual(len(models.storage.all(State)),
+                             models.storage.count(State))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_get_many(self):
+        """Test that get_many returns the objects found, in the ids order"""
+        state1 = State(name="First")
+        state1.save()
+        state2 = State(name="Second")
+        state2.save()
+        self.assertEqual(models.storage.get_many(State, [state2.id, "nope",
+                                                         state1.id]),
+                         [state2, state1])
+        self.assertEqual(models.storage.get_many("hola", [state1.id]), [])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_bulk_new(self):
+        """Test that bulk_new inserts with one statement per class, batch"""
+        count = models.storage.count(State)
+        states = [State(name="Bulk") for i in range(5)]
+        with QueryCounter() as queries:
+            models.storage.bulk_new(states, batch_size=3)
+        # an INSERT and the UPDATE of the version per batch
+        self.assertLessEqual(queries.count, 4)
+        self.assertEqual(models.storage.count(State), count + 5)
+        for state in models.storage.get_many(State,
+                                             [s.id for s in states]):
+            self.assertEqual(state.name, "Bulk")
+            models.storage.delete(state)
+        models.storage.save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_load_relationships(self):
+        """Test that all() and get() with load do not query once per parent"""
+        states = [State(name="Eager") for i in range(3)]
+        for state in states:
+            models.storage.new(state)
+            for i in range(2):
+                models.storage.new(City(name="Eager", state_id=state.id))
+        models.storage.save()
+        models.storage.close()
+        with QueryCounter() as queries:
+            loaded = models.storage.all(State, load=("cities",))
+            for state in loaded.values():
+                [city.name for city in state.cities]
+        self.assertEqual(queries.count, 2)
+        models.storage.close()
+        with QueryCounter() as queries:
+            state = models.storage.get(State, states[0].id, load=("cities",))
+            self.assertEqual(len(state.cities), 2)
+        self.assertEqual(queries.count, 1)
+        models.storage.close()
+        with QueryCounter() as queries:
+            loaded = models.storage.all(City, load=("places.reviews",))
+            for city in loaded.values():
+                [review.id for place in city.places
+                 for review in place.reviews]
+        self.assertLessEqual(queries.count, 3)
+        for state in states:
+            models.storage.delete(models.storage.get(State, state.id))
+        models.storage.save()
+
     def test_db_storage_get(self):
         '''
             Check if instance gotten for DBStorage
@@ -125,3 +247,412 @@ class TestDBStorage(unittest.TestCase):
         cls_count = storage.count("State")
         self.assertIsInstance(cls_count, int)
         self.assertGreaterEqual(all_count, cls_count)
+
+
+class TestDBStoragePool(unittest.TestCase):
+    """Test the connection pool of DBStorage, against a SQLite file"""
+
+    def setUp(self):
+        """Create the SQLite file"""
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+
+    def tearDown(self):
+        """Remove the SQLite file"""
+        os.remove(self.path)
+
+    def test_engine_options(self):
+        """Test that the pool settings are read from the environment"""
+        env = {"HBNB_MYSQL_POOL_SIZE": "20", "HBNB_MYSQL_MAX_OVERFLOW": "5",
+               "HBNB_MYSQL_POOL_TIMEOUT": "2.5",
+               "HBNB_MYSQL_POOL_RECYCLE": "600",
+               "HBNB_MYSQL_POOL_PRE_PING": "0"}
+        with mock.patch.dict(os.environ, env):
+            self.assertEqual(db_storage.engine_options(),
+                             {"pool_size": 20, "max_overflow": 5,
+                              "pool_timeout": 2.5, "pool_recycle": 600,
+                              "pool_pre_ping": False})
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(db_storage.engine_options(),
+                             {"pool_recycle": 3600, "pool_pre_ping": True})
+
+    def run_threads(self, engine, count, hold):
+        """Hold a connection for hold seconds in count threads at once"""
+        results = []
+
+        def work():
+            """checks out a connection and keeps it for a while"""
+            try:
+                with engine.connect() as conn:
+                    conn.exec_driver_sql("SELECT 1")
+                    time.sleep(hold)
+                results.append("ok")
+            except TimeoutError:
+                results.append("timeout")
+        threads = [Thread(target=work) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sorted(results)
+
+    def test_saturated_pool_waits(self):
+        """Test that checkouts past the pool size wait and are logged"""
+        engine = db_storage.make_engine("sqlite:///" + self.path,
+                                        pool_size=2, max_overflow=0,
+                                        pool_timeout=5)
+        with self.assertLogs("models.engine.db_storage", "WARNING"):
+            results = self.run_threads(engine, 4, 0.2)
+        self.assertEqual(results, ["ok"] * 4)
+        self.assertEqual(engine.pool.checkouts, 4)
+        self.assertGreaterEqual(engine.pool.wait_max, 0.1)
+        engine.dispose()
+
+    def test_saturated_pool_times_out(self):
+        """Test that checkouts waiting longer than pool_timeout fail"""
+        engine = db_storage.make_engine("sqlite:///" + self.path,
+                                        pool_size=2, max_overflow=0,
+                                        pool_timeout=0.1)
+        results = self.run_threads(engine, 4, 0.5)
+        self.assertEqual(results, ["ok", "ok", "timeout", "timeout"])
+        engine.dispose()
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDBStorageReplicas(unittest.TestCase):
+    """Test the routing of reads to replicas, against SQLite files"""
+
+    def setUp(self):
+        """Create a DBStorage on a primary and two replica SQLite files"""
+        self.paths = {}
+        for host in ("primary", "replica1", "replica2"):
+            fd, self.paths[host] = tempfile.mkstemp(suffix=".db")
+            os.close(fd)
+        self.storage = self.make_storage()
+        self.replicas = self.storage._DBStorage__replicas
+        for engine in self.replicas:
+            Base.metadata.create_all(engine)
+            db_storage.versions.metadata.create_all(engine)
+
+    def make_storage(self, **env):
+        """Create a DBStorage on the primary and replica files"""
+        make_engine = db_storage.make_engine
+
+        def sqlite_engine(url, **options):
+            """engine of the SQLite file standing in for the host of url"""
+            host = url.split("@")[1].split("/")[0]
+            return make_engine("sqlite:///" + self.paths[host], **options)
+        env.setdefault("HBNB_CACHE_SIZE", "0")
+        env.update({"HBNB_TYPE_STORAGE": "db", "HBNB_MYSQL_HOST": "primary",
+                    "HBNB_ENV": "",
+                    "HBNB_MYSQL_REPLICA_HOSTS": "replica1, replica2"})
+        with mock.patch.dict(os.environ, env), \
+                mock.patch.object(db_storage, "make_engine",
+                                  side_effect=sqlite_engine):
+            storage = DBStorage()
+        storage.reload()
+        return storage
+
+    def tearDown(self):
+        """Remove the SQLite files"""
+        self.storage.close()
+        self.storage._DBStorage__engine.dispose()
+        for engine in self.replicas:
+            engine.dispose()
+        for path in self.paths.values():
+            os.remove(path)
+
+    def replicate(self, engine, state):
+        """Copy the row of state to the replica engine"""
+        with engine.begin() as conn:
+            conn.execute(State.__table__.insert(),
+                         {"id": state.id, "name": state.name,
+                          "created_at": state.created_at,
+                          "updated_at": state.updated_at})
+
+    def test_reads_go_round_robin(self):
+        """Test that each session reads from the next replica"""
+        state = State(name="California")
+        self.replicate(self.replicas[0], state)
+        counts = []
+        for i in range(4):
+            counts.append(self.storage.count(State))
+            self.storage.close()
+        self.assertEqual(counts, [1, 0, 1, 0])
+
+    def test_read_your_writes(self):
+        """Test that reads go to the primary after a write until close()"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        self.assertEqual(self.storage.count(State), 1)
+        self.assertEqual(len(self.storage.all(State)), 1)
+        self.storage.close()
+        self.assertEqual(self.storage.count(State), 0)
+        self.assertIsNone(self.storage.get(State, state.id))
+
+    def test_cache_filled_from_primary(self):
+        """Test that the object cache is not filled by a lagging replica"""
+        storage = self.make_storage(HBNB_CACHE_SIZE="10")
+        self.addCleanup(storage._DBStorage__engine.dispose)
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        storage.close()
+        for engine in storage._DBStorage__replicas:
+            self.replicate(engine, state)
+        state.name = "Nevada"
+        storage.new(state)
+        storage.save()
+        storage.close()
+        # the replicas still have California
+        self.assertEqual(storage.get(State, state.id).name, "Nevada")
+        storage.close()
+        self.assertEqual(storage.get(State, state.id).name, "Nevada")
+        self.assertEqual(storage.cache_stats()["hits"], 1)
+        storage.close()
+        for engine in storage._DBStorage__replicas:
+            engine.dispose()
+
+    def test_update_object_read_from_replica(self):
+        """Test that changes to an object read from a replica are written
+        to the primary"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.close()
+        for engine in self.replicas:
+            self.replicate(engine, state)
+        replica_state = self.storage.get(State, state.id)
+        self.assertIsNotNone(replica_state)
+        replica_state.name = "Nevada"
+        self.storage.new(replica_state)
+        self.storage.save()
+        self.storage.close()
+        with self.storage._DBStorage__engine.connect() as conn:
+            name = conn.execute(select(State.name)).scalar()
+        self.assertEqual(name, "Nevada")
+
+
+def sqlite_storage(test, **env):
+    """Create a DBStorage on a new SQLite file, removed after test"""
+    directory = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directory)
+    env.setdefault("HBNB_CACHE_SIZE", "0")
+    env.update({"HBNB_TYPE_STORAGE": "sqlite", "HBNB_ENV": "",
+                "HBNB_SQLITE_PATH": os.path.join(directory, "hbnb.db")})
+    with mock.patch.dict(os.environ, env):
+        storage = DBStorage()
+    storage.reload()
+    test.addCleanup(storage._DBStorage__engine.dispose)
+    test.addCleanup(storage.close)
+    return storage
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDBStorageSQLite(unittest.TestCase):
+    """Test DBStorage with HBNB_TYPE_STORAGE=sqlite"""
+
+    def make_storage(self, **env):
+        """Create a DBStorage on a new SQLite file"""
+        return sqlite_storage(self, **env)
+
+    def test_sqlite_url(self):
+        """Test the URL of the SQLite file, with and without shared cache"""
+        self.assertEqual(db_storage.sqlite_url("/tmp/hbnb.db"),
+                         "sqlite:////tmp/hbnb.db")
+        self.assertEqual(db_storage.sqlite_url("/tmp/hbnb.db", True),
+                         "sqlite:///file:/tmp/hbnb.db?cache=shared&uri=true")
+
+    def test_pragmas(self):
+        """Test that the connections use WAL and the pragmas"""
+        storage = self.make_storage()
+        engine = storage._DBStorage__engine
+        self.assertEqual(engine.dialect.name, "sqlite")
+        with engine.connect() as conn:
+            for name in ("journal_mode", "synchronous", "foreign_keys"):
+                value = conn.exec_driver_sql("PRAGMA " + name).scalar()
+                self.assertIn(str(value).lower(), {
+                    "journal_mode": ("wal",), "synchronous": ("1",),
+                    "foreign_keys": ("1",)}[name])
+
+    def test_page_index(self):
+        """Test that pages are read in the order of an index"""
+        storage = self.make_storage()
+        with storage._DBStorage__engine.connect() as conn:
+            for cls in classes.values():
+                plan = conn.exec_driver_sql(
+                    "EXPLAIN QUERY PLAN SELECT * FROM {} ORDER BY created_at,"
+                    " id LIMIT 10".format(cls.__tablename__)).all()
+                self.assertIn("USING INDEX ix_{}_created_at_id".format(
+                    cls.__tablename__), plan[0][-1])
+
+    def test_version(self):
+        """Test that versions change with each commit that changes the
+        objects of the class, in this storage and in another one"""
+        storage = self.make_storage()
+        other = DBStorage.__new__(DBStorage)
+        other._DBStorage__engine = storage._DBStorage__engine
+        other.reload()
+        self.addCleanup(other.close)
+        before = storage.version(City)
+        version = other.version(State)
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        self.assertNotEqual(other.version(State), version)
+        version = other.version(State)
+        state.name = "Nevada"
+        # the autoflush of count() writes the change before save()
+        storage.count(City)
+        storage.save()
+        self.assertNotEqual(other.version(State), version)
+        self.assertEqual(storage.version(City), before)
+        self.assertIsNone(storage.version("hola"))
+
+    def test_save_get(self):
+        """Test that objects are saved and read back from the file"""
+        for shared_cache in ("0", "1"):
+            storage = self.make_storage(
+                HBNB_SQLITE_SHARED_CACHE=shared_cache)
+            state = State(name="California")
+            storage.new(state)
+            storage.save()
+            storage.close()
+            self.assertEqual(storage.get(State, state.id).name, "California")
+            self.assertEqual(storage.count(State), 1)
+
+
+class TestObjectCache(unittest.TestCase):
+    """Test the LRU cache of models/engine/object_cache.py"""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used object is evicted first"""
+        cache = ObjectCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats(), {"hits": 3, "misses": 1,
+                                         "evictions": 1, "size": 2})
+
+    def test_ttl(self):
+        """Test that objects expire ttl seconds after they are stored"""
+        cache = ObjectCache(10, ttl=5)
+        with mock.patch("models.engine.object_cache.monotonic",
+                        return_value=100):
+            cache.put("a", 1)
+        with mock.patch("models.engine.object_cache.monotonic",
+                        return_value=104):
+            self.assertEqual(cache.get("a"), 1)
+        with mock.patch("models.engine.object_cache.monotonic",
+                        return_value=105):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_pop(self):
+        """Test that pop() and clear() remove objects"""
+        cache = ObjectCache(10)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.pop("a")
+        cache.pop("missing")
+        self.assertIsNone(cache.get("a"))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDBStorageCache(unittest.TestCase):
+    """Test DBStorage.get() through the object cache"""
+
+    def setUp(self):
+        """Create a DBStorage with a cache of 2 objects"""
+        self.storage = sqlite_storage(self, HBNB_CACHE_SIZE="2")
+        self.queries = []
+        event.listen(self.storage._DBStorage__engine, "before_execute",
+                     self.count_query)
+
+    def count_query(self, conn, clauseelement, *args):
+        """Remember the statements sent to the database"""
+        self.queries.append(clauseelement)
+
+    def add_state(self, name):
+        """Save a new State and start a new session"""
+        state = State(name=name)
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.close()
+        return state
+
+    def test_no_cache(self):
+        """Test that there is no cache without HBNB_CACHE_SIZE"""
+        with mock.patch.dict(os.environ, {"HBNB_CACHE_SIZE": "0"}):
+            self.assertIsNone(sqlite_storage(self).cache_stats())
+
+    def test_hit_without_query(self):
+        """Test that a cached object is returned without any SELECT"""
+        state = self.add_state("California")
+        self.assertEqual(self.storage.get(State, state.id).name, "California")
+        self.storage.close()
+        del self.queries[:]
+        cached = self.storage.get(State, state.id)
+        self.assertEqual(self.queries, [])
+        self.assertEqual(cached.name, "California")
+        self.assertEqual(self.storage.cache_stats(),
+                         {"hits": 1, "misses": 1, "evictions": 0, "size": 1})
+        # the copy is in the current session: its relationships load
+        self.assertEqual(cached.cities, [])
+
+    def test_invalidation(self):
+        """Test that saved and deleted objects leave the cache"""
+        state = self.add_state("California")
+        self.storage.get(State, state.id).name = "Nevada"
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, state.id).name, "Nevada")
+        self.storage.close()
+        self.storage.delete(self.storage.get(State, state.id))
+        self.storage.save()
+        self.storage.close()
+        self.assertIsNone(self.storage.get(State, state.id))
+
+    def test_unsaved_changes_not_cached(self):
+        """Test that changes that are not saved do not reach the cache"""
+        state = self.add_state("California")
+        self.storage.get(State, state.id).name = "Nevada"
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, state.id).name, "California")
+
+    def test_session_changes_kept(self):
+        """Test that get() returns the object the session holds, with its
+        changes, instead of the cached one"""
+        state = self.add_state("California")
+        self.storage.get(State, state.id)
+        self.storage.close()
+        changed = self.storage.get(State, state.id)
+        changed.name = "Nevada"
+        self.assertIs(self.storage.get(State, state.id), changed)
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, state.id).name, "Nevada")
+
+    def test_autoflushed_changes_invalidated(self):
+        """Test that changes written by an autoflush leave the cache"""
+        state = self.add_state("California")
+        self.storage.get(State, state.id).name = "Nevada"
+        self.storage.count(City)
+        self.storage.save()
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, state.id).name, "Nevada")
+
+    def test_eviction(self):
+        """Test that the cache keeps its size"""
+        states = [self.add_state(str(i)) for i in range(3)]
+        for state in states:
+            self.storage.get(State, state.id)
+        self.assertEqual(self.storage.cache_stats()["evictions"], 1)
+        self.assertEqual(self.storage.cache_stats()["size"], 2)
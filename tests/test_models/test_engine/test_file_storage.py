@@ -18,6 +18,7 @@ import json
 import os
 import pep8
 import unittest
+from unittest import mock
 from models import storage
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
@@ -115,6 +116,405 @@ class TestFileStorage(unittest.TestCase):
             js = f.read()
         self.assertEqual(json.loads(string), json.loads(js))
 
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_and_count_by_class(self):
+        """Test that all(cls) and count(cls) only return objects of cls"""
+        storage = FileStorage()
+        state = State()
+        city = City()
+        storage.new(state)
+        storage.new(city)
+        states = storage.all(State)
+        self.assertIn("State." + state.id, states)
+        self.assertNotIn("City." + city.id, states)
+        self.assertEqual(states, storage.all("State"))
+        self.assertEqual(storage.count(State), len(states))
+        storage.delete(state)
+        self.assertNotIn("State." + state.id, storage.all(State))
+        self.assertEqual(storage.count("State"), len(states) - 1)
+        self.assertEqual(storage.count("Nope"), 0)
+        storage.delete(city)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_iter_all(self):
+        """Test that iter_all yields the same objects as all()"""
+        storage = FileStorage()
+        state = State()
+        storage.new(state)
+        self.assertEqual(list(storage.iter_all(State)),
+                         list(storage.all(State).values()))
+        self.assertEqual(len(list(storage.iter_all())), storage.count())
+        for obj in storage.iter_all(State):
+            storage.delete(obj)
+            storage.new(obj)
+        storage.delete(state)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_count_all(self):
+        """Test that count_all matches count for every class"""
+        storage = FileStorage()
+        counts = storage.count_all()
+        self.assertEqual(set(counts), set(classes))
+        for name, cls in classes.items():
+            self.assertEqual(counts[name], storage.count(cls))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_related_follows_foreign_keys(self):
+        """Test that the foreign key indexes follow new, setattr, delete"""
+        storage = FileStorage()
+        state1 = State()
+        state2 = State()
+        city = City(state_id=state1.id)
+        for obj in (state1, state2, city):
+            storage.new(obj)
+        self.assertEqual(storage.related(City, "state_id", state1.id), [city])
+        self.assertEqual(state1.cities, [city])
+        city.state_id = state2.id
+        self.assertEqual(state1.cities, [])
+        self.assertEqual(state2.cities, [city])
+        storage.delete(city)
+        self.assertEqual(state2.cities, [])
+        storage.delete(state1)
+        storage.delete(state2)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_page(self):
+        """Test that page walks objects in (created_at, id) order"""
+        storage = FileStorage()
+        state = State()
+        cities = [City(state_id=state.id) for i in range(5)]
+        for obj in [state] + cities:
+            storage.new(obj)
+        cities.sort(key=lambda c: (c.created_at, c.id))
+        first = storage.page(City, 2, state_id=state.id)
+        self.assertEqual(first, cities[:2])
+        after = (first[-1].created_at, first[-1].id)
+        self.assertEqual(storage.page(City, 10, after, state_id=state.id),
+                         cities[2:])
+        everything = storage.page(City, storage.count(City))
+        self.assertEqual(len(everything), storage.count(City))
+        storage.delete(cities[0])
+        self.assertNotIn(cities[0], storage.page(City, storage.count(City)))
+        for obj in [state] + cities[1:]:
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_page_kept_sorted(self):
+        """Test that the sorted lists of page() follow the changes to the
+        objects instead of being sorted again"""
+        storage = FileStorage()
+        state1 = State()
+        state2 = State()
+        cities = [City(state_id=state1.id) for i in range(5)]
+        for obj in [state1, state2] + cities:
+            storage.new(obj)
+
+        def expected(state):
+            """the cities of state, sorted"""
+            return sorted([city for city in storage.all(City).values()
+                           if city.state_id == state.id],
+                          key=lambda c: (c.created_at, c.id))
+
+        storage.page(City, 1)
+        storage.page(City, 1, state_id=state1.id)
+        storage.page(City, 1, state_id=state2.id)
+        sort = mock.patch.object(FileStorage, "_FileStorage__sort",
+                                 side_effect=AssertionError("sorted"))
+        with sort:
+            cities[0].created_at = datetime(2000, 1, 1)
+            cities[1].state_id = state2.id
+            cities[2].save()
+            storage.delete(cities[3])
+            storage.new(City(state_id=state2.id))
+            for state in (state1, state2):
+                self.assertEqual(storage.page(City, 10, state_id=state.id),
+                                 expected(state))
+            every = storage.page(City, storage.count(City))
+            self.assertEqual(every, sorted(storage.all(City).values(),
+                                           key=lambda c: (c.created_at, c.id)))
+            self.assertEqual(every[0], cities[0])
+        for obj in storage.all(City).values():
+            if obj.state_id in (state1.id, state2.id):
+                storage.delete(obj)
+        storage.delete(state1)
+        storage.delete(state2)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_places(self):
+        """Test that search_places intersects the state/city/amenity sets"""
+        storage = FileStorage()
+        state = State()
+        city1 = City(state_id=state.id)
+        city2 = City(state_id="elsewhere")
+        wifi = Amenity()
+        pool = Amenity()
+        place1 = Place(city_id=city1.id, amenity_ids=[wifi.id, pool.id])
+        place2 = Place(city_id=city1.id, amenity_ids=[wifi.id])
+        place3 = Place(city_id=city2.id, amenity_ids=[pool.id])
+        objs = [state, city1, city2, wifi, pool, place1, place2, place3]
+        for obj in objs:
+            storage.new(obj)
+        search = storage.search_places
+        self.assertEqual(set(search(states=[state.id])), {place1, place2})
+        self.assertEqual(set(search(states=[state.id], cities=[city2.id])),
+                         {place1, place2, place3})
+        self.assertEqual(set(search(amenities=[pool.id])), {place1, place3})
+        self.assertEqual(search(states=[state.id],
+                                amenities=[wifi.id, pool.id]), [place1])
+        place2.amenity_ids = [wifi.id, pool.id]
+        self.assertEqual(set(search(cities=[city1.id],
+                                    amenities=[pool.id])), {place1, place2})
+        self.assertEqual(search(amenities=[wifi.id, "missing"]), [])
+        first = search(cities=[city1.id], limit=1)
+        after = (first[0].created_at, first[0].id)
+        self.assertEqual(first + search(cities=[city1.id], after=after),
+                         sorted([place1, place2],
+                                key=lambda p: (p.created_at, p.id)))
+        for obj in objs:
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_version(self):
+        """Test that version changes when objects of the class change"""
+        storage = FileStorage()
+        state = State()
+        before = storage.version(City)
+        version = storage.version(State)
+        storage.new(state)
+        self.assertNotEqual(storage.version(State), version)
+        version = storage.version("State")
+        state.name = "Versioned"
+        self.assertNotEqual(storage.version(State), version)
+        version = storage.version(State)
+        storage.delete(state)
+        self.assertNotEqual(storage.version(State), version)
+        self.assertEqual(storage.version(City), before)
+        with mock.patch.object(FileStorage, "_FileStorage__nonce", "other"):
+            # the same changes in another process give another version
+            self.assertNotEqual(storage.version(City), before)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_get(self):
+        """Test that get returns the object stored under <class name>.id"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        instance = State()
+        storage.new(instance)
+        self.assertIs(storage.get(State, instance.id), instance)
+        self.assertIs(storage.get("State", instance.id), instance)
+        self.assertIsNone(storage.get(City, instance.id))
+        self.assertIsNone(storage.get(State, "missing"))
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_bulk_new(self):
+        """Test that bulk_new stores every object with a single save"""
+        storage = FileStorage()
+        reviews = [Review(text="Bulk") for i in range(5)]
+        with mock.patch.object(FileStorage, "save") as save:
+            storage.bulk_new(reviews)
+        self.assertEqual(save.call_count, 1)
+        for review in reviews:
+            self.assertIs(storage.get(Review, review.id), review)
+            storage.delete(review)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_get_many(self):
+        """Test that get_many returns the objects found, in the ids order"""
+        storage = FileStorage()
+        state1 = State()
+        state2 = State()
+        storage.new(state1)
+        storage.new(state2)
+        self.assertEqual(storage.get_many(State, [state2.id, "missing",
+                                                  state1.id]),
+                         [state2, state1])
+        self.assertEqual(storage.get_many("City", [state1.id]), [])
+        self.assertEqual(storage.get_many(State, []), [])
+        storage.delete(state1)
+        storage.delete(state2)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_only_serializes_dirty_objects(self):
+        """Test that save only calls to_dict on objects changed since"""
+        storage = FileStorage()
+        state = State(name="Clean")
+        city = City(name="Clean")
+        storage.new(state)
+        storage.new(city)
+        storage.save()
+        state.name = "Dirty"
+        with mock.patch.object(State, "to_dict",
+                               side_effect=State.to_dict,
+                               autospec=True) as state_to_dict, \
+                mock.patch.object(City, "to_dict", autospec=True) as \
+                city_to_dict:
+            storage.save()
+        self.assertEqual(state_to_dict.call_count, 1)
+        self.assertIs(state_to_dict.call_args[0][0], state)
+        self.assertFalse(city_to_dict.called)
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        self.assertEqual(saved["State." + state.id]["name"], "Dirty")
+        self.assertEqual(saved["City." + city.id]["name"], "Clean")
+        storage.delete(state)
+        storage.delete(city)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_and_reload_datetimes(self):
+        """Test that datetimes written by the JSON codec are read back"""
+        storage = FileStorage()
+        state = State()
+        state.created_at = datetime(2017, 9, 28, 21, 3, 54)
+        storage.new(state)
+        storage.save()
+        with open("file.json", "r") as f:
+            saved = json.load(f)["State." + state.id]
+        self.assertEqual(State(**saved).to_dict(), state.to_dict())
+        storage.delete(state)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_lazy_reload(self):
+        """Test that lazy mode only builds objects when they are used"""
+        storage = FileStorage()
+        state = State(name="Lazy")
+        city = City(name="Lazy", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        storage.save()
+        count = storage.count()
+        storage._FileStorage__lazy = True
+        storage.reload()
+        objects = FileStorage._FileStorage__objects
+        self.assertNotIn("State." + state.id, objects)
+        self.assertEqual(storage.count(), count)
+        lazy_state = storage.get(State, state.id)
+        self.assertIsNot(lazy_state, state)
+        self.assertEqual(lazy_state.name, "Lazy")
+        self.assertNotIn("City." + city.id, objects)
+        storage.save()
+        with open("file.json", "r") as f:
+            self.assertIn("City." + city.id, json.load(f))
+        self.assertEqual([c.id for c in lazy_state.cities], [city.id])
+        storage._FileStorage__lazy = False
+        storage.all()
+        storage.delete(lazy_state)
+        storage.delete(storage.get(City, city.id))
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_records_format(self):
+        """Test saving to and lazily reading from the mmap'ed record file"""
+        storage = FileStorage()
+        storage._FileStorage__format = "records"
+        state = State(name="Mapped")
+        storage.new(state)
+        storage.save()
+        self.assertTrue(os.path.exists("file.json.rec"))
+        storage.delete(state)
+        storage._FileStorage__pending.clear()
+        storage.reload()
+        raw = FileStorage._FileStorage__raw["State"]
+        self.assertIs(type(raw["State." + state.id]), tuple)
+        self.assertEqual(storage.get(State, state.id).name, "Mapped")
+        self.assertNotIn("State." + state.id, raw)
+        storage.all()
+        storage.delete(storage.get(State, state.id))
+        storage.save()
+        os.remove("file.json.rec")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_close_reloads_only_changed_file(self):
+        """Test that close only reloads file.json when the file changed"""
+        storage = FileStorage()
+        storage.save()
+        with mock.patch.object(FileStorage, "reload") as reload:
+            storage.close()
+            self.assertFalse(reload.called)
+            st = os.stat("file.json")
+            os.utime("file.json", ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+            storage.close()
+            self.assertTrue(reload.called)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_journal_save_and_replay(self):
+        """Test that journal mode appends changes and reload replays them"""
+        storage = FileStorage()
+        storage.save()
+        storage._FileStorage__journal = True
+        state = State(name="Journal")
+        storage.new(state)
+        storage.save()
+        with open("file.json.log", "r") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["op"], "put")
+        self.assertEqual(records[0]["key"], "State." + state.id)
+        with open("file.json", "r") as f:
+            self.assertNotIn(state.id, f.read())
+        storage.delete(state)
+        storage._FileStorage__pending.clear()
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).name, "Journal")
+        storage.delete(state)
+        storage.save()
+        storage.reload()
+        self.assertIsNone(storage.get(State, state.id))
+        storage._FileStorage__journal = False
+        storage.save()
+        self.assertFalse(os.path.exists("file.json.log"))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_journal_torn_line(self):
+        """Test that a torn last line is skipped by reload and cut off by
+        the next save, before it appends"""
+        storage = FileStorage()
+        storage.save()
+        storage._FileStorage__journal = True
+        before = State(name="before-crash")
+        storage.new(before)
+        storage.save()
+        with open("file.json.log", "a") as f:
+            f.write('{"op": "put", "key": "State.torn", "obj": {"na')
+        size = os.path.getsize("file.json.log")
+        storage.reload()
+        # the line may still be being written by another process
+        self.assertEqual(os.path.getsize("file.json.log"), size)
+        after = State(name="after-restart")
+        storage.new(after)
+        storage.save()
+        storage.delete(before)
+        storage.delete(after)
+        storage._FileStorage__pending.clear()
+        storage.reload()
+        self.assertEqual(storage.get(State, before.id).name, "before-crash")
+        self.assertEqual(storage.get(State, after.id).name, "after-restart")
+        with open("file.json.log", "r") as f:
+            self.assertEqual(len([json.loads(line) for line in f]), 2)
+        storage.delete(before)
+        storage.delete(after)
+        storage._FileStorage__journal = False
+        storage.save()
+
+    def test_journal_corrupt_line(self):
+        """Test that reload fails on a bad line in the middle of the journal
+        instead of dropping the records after it"""
+        storage = FileStorage()
+        storage.save()
+        with open("file.json.log", "w") as f:
+            f.write('{"op": "delete", "key": "State.a"}\n'
+                    'not a record\n'
+                    '{"op": "delete", "key": "State.b"}\n')
+        with self.assertRaises(ValueError):
+            storage.reload()
+        with open("file.json.log", "r") as f:
+            self.assertEqual(len(f.readlines()), 3)
+        os.remove("file.json.log")
+        storage.reload()
+
     def test_db_storage_get(self):
         '''
             Check if instance gotten for DBStorage
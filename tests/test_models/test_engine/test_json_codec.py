@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+"""
+Contains the TestJSONCodecDocs and TestJSONCodec classes
+"""
+
+from api.v1.app import app
+from datetime import datetime
+from models import storage
+from models.engine import json_codec
+from models.state import State
+import models
+import pep8
+import unittest
+
+big = 123456789012345678901234567890
+
+
+class TestJSONCodecDocs(unittest.TestCase):
+    """Tests to check the documentation and style of json_codec.py"""
+
+    def test_pep8_conformance_json_codec(self):
+        """Test that models/engine/json_codec.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/json_codec.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_json_codec(self):
+        """Test that tests/test_models/test_engine/test_json_codec.py
+        conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(
+            ['tests/test_models/test_engine/test_json_codec.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_json_codec_module_docstring(self):
+        """Test for the json_codec.py module docstring"""
+        self.assertIsNot(json_codec.__doc__, None,
+                         "json_codec.py needs a docstring")
+        self.assertTrue(len(json_codec.__doc__) >= 1,
+                        "json_codec.py needs a docstring")
+
+
+class TestJSONCodec(unittest.TestCase):
+    """Test the JSON backends"""
+
+    def installed(self):
+        """yields the (name, dumps, loads) of the installed backends"""
+        for name in json_codec.backends:
+            found, dumps, loads = json_codec.load_backend(name)
+            if found == name:
+                yield name, dumps, loads
+
+    def test_round_trip(self):
+        """Test that every backend reads back what it writes"""
+        obj = {"name": "Nevada", "n": 5, "x": 1.5, "l": [1, "a", None],
+               "ok": True, "text": "déjà vu / ünïcode"}
+        for name, dumps, loads in self.installed():
+            with self.subTest(backend=name):
+                self.assertEqual(loads(dumps(obj)), obj)
+                self.assertEqual(loads(dumps(obj).encode("utf-8")), obj)
+                self.assertEqual(list(json_codec._json_loads(
+                    dumps(obj, sort_keys=True))), sorted(obj))
+
+    def test_big_integers(self):
+        """Test that integers out of the 64 bit range stay exact"""
+        numbers = [big, -big, 2 ** 63, -2 ** 63 - 1, 2 ** 64, 2 ** 64 - 1,
+                   2 ** 63 - 1, -2 ** 63]
+        for name, dumps, loads in self.installed():
+            with self.subTest(backend=name):
+                text = dumps({"numbers": numbers})
+                self.assertEqual(json_codec._json_loads(text),
+                                 {"numbers": numbers})
+                self.assertEqual(loads(text), {"numbers": numbers})
+                self.assertEqual(loads(text.encode("utf-8")),
+                                 {"numbers": numbers})
+                # a long run of digits in a string is still a string
+                self.assertEqual(loads(dumps({"a": "1" * 30})),
+                                 {"a": "1" * 30})
+
+    def test_datetimes(self):
+        """Test that every backend writes datetimes"""
+        when = datetime(2020, 1, 2, 3, 4, 5, 6)
+        for name, dumps, loads in self.installed():
+            with self.subTest(backend=name):
+                self.assertEqual(loads(dumps({"t": when})),
+                                 {"t": "2020-01-02T03:04:05.000006"})
+                self.assertEqual(loads(dumps({"t": when, "n": big})),
+                                 {"t": "2020-01-02T03:04:05.000006",
+                                  "n": big})
+                with self.assertRaises(TypeError):
+                    dumps({"o": object()})
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_api_big_integer(self):
+        """Test that the API answers a big integer as it was sent"""
+        client = app.test_client()
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        url = "/api/v1/states/" + state.id
+        response = client.put(url, data='{"big": ' + str(big) + '}',
+                              content_type="application/json")
+        self.assertEqual(response.get_json()["big"], big)
+        self.assertIn(str(big).encode(), response.data)
+        storage.close()
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).big, big)
+        storage.delete(storage.get(State, state.id))
+        storage.save()